@@ -32,7 +32,6 @@
   
   Not implemented yet:
   1. LOBs are not handled, you get in the csv what is in the IXF field 
-  2. DECFLOAT (packed decimal)
   
   The file structure info as present in the IBM DB2 public documentation 
   
@@ -249,14 +248,17 @@ DB2 SQLCA RECORD (RT=A+A)
    IXFASLCA       136-BYTE  variable    sqlca - SQL communications area
 
 """
-import os,sys,json,csv,struct,time,traceback,logging, pprint, types
+import os,sys,json,csv,struct,time,traceback,logging, pprint, types, io, mmap, stat, codecs, bisect, shutil, collections, locale, hashlib, threading, decimal, operator, re, gzip, bz2, lzma, queue
+import concurrent.futures
 
-def readFilePart(fn,offset,read_len,lobFolder=None,trace=False):
+def readFilePart(fn,offset,read_len,lobFolder=None,trace=False,lobFiles=None):
     """
     Used by lob locators to retrieve the lob information of a lob.
     If the export was done with "lobs to" then unless you specify
     the lob folder this routine will attempt to search in the CWD
     for the lob file.
+    The lob file is read using the lobFiles pool (LobFilePool) if provided
+    or opened and closed for this read.
     """
     if trace:
         print("ReadFilePart:fn=",fn," offset=",offset,
@@ -264,28 +266,183 @@ def readFilePart(fn,offset,read_len,lobFolder=None,trace=False):
               file=sys.stderr
         )
     
+    if lobFiles is not None:
+        return lobFiles.read(fn,offset,read_len,lobFolder)
+    
+    fn=findLobFile(fn,lobFolder)
+    with open(fn,"rb") as fin:
+        fin.seek(offset, 0)
+        return fin.read(read_len)    
+
+def findLobFile(fn,lobFolder=None):
+    """
+    Return the path of the lob file fn, searched in the CWD then
+    in the lobFolder and its sub-folders.
+    """
     if not os.path.exists(fn):
         if lobFolder:
             #print(">>Using lobFolder:",lobFolder,file=sys.stderr)
             nfn=os.path.join(lobFolder,fn)
         else:
             nfn=fn
-        if not os.path.exists(nfn):
+        if not os.path.exists(nfn) and lobFolder:
             #print(">>Searching lobFolder:",lobFolder,file=sys.stderr)
-            nfn=None
-            for dirname,dirs,files in os.walk(lobFolder):
-                if nfn:
-                    break
-                for sfn in files:
-                    if sfn==fn:
-                        nfn=os.path.join(dirname,sfn)
-                        break
-        if os.path.exists(nfn):
+            nfn=lookupLobFolder(lobFolder,fn)
+        if nfn and os.path.exists(nfn):
             fn=nfn
+    return fn
+
+# lob folder file indexes shared by all the parsers of the process:
+# absolute lob folder path -> {file name: file path (None if not found)}
+lobFolderIndexes={}
+
+def lookupLobFolder(lobFolder,fn):
+    """
+    Return the path of the file fn found in the lob folder (or its sub-folders),
+    None if not found.
+    The folder is scanned once in a file name index, a name that is not in the
+    index triggers a new scan (files created since the last scan), names still
+    not found are remembered so they do not trigger other scans.
+    """
+    key=os.path.abspath(lobFolder)
+    idx=lobFolderIndexes.get(key)
+    if idx is None or fn not in idx:
+        nidx={}
+        for dirname,dirs,files in os.walk(lobFolder):
+            for sfn in files:
+                if sfn not in nidx:
+                    nidx[sfn]=os.path.join(dirname,sfn)
+        if idx:
+            for sfn in idx:
+                nidx.setdefault(sfn,None)
+        nidx.setdefault(fn,None)
+        lobFolderIndexes[key]=idx=nidx
+    return idx[fn]
+
+class LobFilePool:
+    """
+    A pool of open lob files, with "lobs to" exports many lobs are stored
+    in the same lob file so the files are kept open (and memory mapped if
+    useMmap is True) between the reads of the lobs.
+    The least recently used file is closed when more than maxHandles files are open.
+    The lobs of a batch of rows can be prefetched (see prefetch), nearby lobs
+    of a file are then read with a few large sequential reads.
+    """
+    def __init__(self,maxHandles=16,useMmap=True,maxGap=64*1024,maxBlock=16*1024*1024):
+        self.maxHandles=max(1,maxHandles)
+        self.useMmap=useMmap
+        self.maxGap=maxGap
+        self.maxBlock=maxBlock
+        self.handles=collections.OrderedDict() # (lobFolder,fn) -> (file,mmap or None)
+        self.blocks={} # prefetched blocks: (lobFolder,fn) -> ([block offsets],[block data])
     
-    with open(fn,"rb") as fin:
+    def prefetch(self,locators):
+        """
+        Read ahead the data of the lob locators: the locators are grouped by
+        lob file and sorted by offset, the ranges separated by less than maxGap
+        bytes are coalesced in blocks of at most maxBlock bytes and each block
+        is read at once. The lobs larger than maxBlock are not prefetched,
+        they are streamed when written (see LobLocator.copyTo).
+        A memory mapped file is only advised (madvise WILLNEED) for the blocks.
+        The blocks are kept until dropPrefetched is called.
+        """
+        ranges={}
+        for ll in locators:
+            if ll.objlen>0:
+                ranges.setdefault((ll.lobFolder,ll.fp),[]).append((ll.offset,ll.offset+ll.objlen))
+        for key,rl in ranges.items():
+            rl.sort()
+            runs=[]
+            start,end=rl[0]
+            for offset,rend in rl[1:]:
+                if offset-end<=self.maxGap and max(end,rend)-start<=self.maxBlock:
+                    end=max(end,rend)
+                else:
+                    runs.append((start,end))
+                    start,end=offset,rend
+            runs.append((start,end))
+            runs=[r for r in runs if r[1]-r[0]<=self.maxBlock]
+            if not runs:
+                continue
+            try:
+                fin,mm=self.getHandle(key[1],key[0])
+            except OSError:
+                continue # reported when the lobs are read
+            if mm is not None:
+                if hasattr(mm,'madvise'):
+                    for start,end in runs:
+                        page=start-start%mmap.PAGESIZE
+                        mm.madvise(mmap.MADV_WILLNEED,page,end-page)
+                continue
+            offsets,data=self.blocks.setdefault(key,([],[]))
+            for start,end in runs:
+                fin.seek(start,0)
+                i=bisect.bisect(offsets,start)
+                offsets.insert(i,start)
+                data.insert(i,memoryview(fin.read(end-start)))
+    
+    def getPrefetched(self,fn,offset,read_len,lobFolder=None):
+        """
+        Return the prefetched data (memoryview) of a lob, None if not prefetched.
+        """
+        b=self.blocks.get((lobFolder,fn))
+        if b is None:
+            return None
+        i=bisect.bisect(b[0],offset)-1
+        if i<0 or offset+read_len>b[0][i]+len(b[1][i]):
+            return None
+        start=offset-b[0][i]
+        return b[1][i][start:start+read_len]
+    
+    def dropPrefetched(self):
+        self.blocks={}
+    
+    def getHandle(self,fn,lobFolder=None):
+        """
+        Return the tuple (file,mmap) of the lob file fn, the mmap is None
+        if the file is not memory mapped.
+        """
+        key=(lobFolder,fn)
+        h=self.handles.get(key)
+        if h is not None:
+            self.handles.move_to_end(key)
+            return h
+        fin=open(findLobFile(fn,lobFolder),"rb")
+        mm=None
+        if self.useMmap:
+            try:
+                mm=mmap.mmap(fin.fileno(),0,access=mmap.ACCESS_READ)
+            except (OSError,ValueError):
+                mm=None # empty or special file, read it with seek/read
+        h=(fin,mm)
+        self.handles[key]=h
+        while len(self.handles)>self.maxHandles:
+            self.closeHandle(self.handles.popitem(last=False)[1])
+        return h
+    
+    def read(self,fn,offset,read_len,lobFolder=None):
+        data=self.getPrefetched(fn,offset,read_len,lobFolder)
+        if data is not None:
+            return data.tobytes()
+        fin,mm=self.getHandle(fn,lobFolder)
+        if mm is not None:
+            return mm[offset:offset+read_len]
         fin.seek(offset, 0)
-        return fin.read(read_len)    
+        return fin.read(read_len)
+    
+    def closeHandle(self,h):
+        fin,mm=h
+        if mm is not None:
+            mm.close()
+        fin.close()
+    
+    def close(self):
+        """
+        Close all the open lob files, the pool can still be used after close.
+        """
+        self.blocks={}
+        while self.handles:
+            self.closeHandle(self.handles.popitem()[1])
 
 class LobLocator:
     """
@@ -293,15 +450,24 @@ class LobLocator:
     syntax (to be put in a .csv file) or access to the data by reading
     it from the lob storage (file).
     """
-    def __init__(self,fp,offset,objlen,lobFolder=None,encoding=None):
+    __slots__=('fp','offset','objlen','lobFolder','encoding','lobFiles')
+    
+    def __init__(self,fp,offset,objlen,lobFolder=None,encoding=None,lobFiles=None):
         self.fp=fp
         self.offset=offset
         self.objlen=objlen
         self.lobFolder=lobFolder
         self.encoding=encoding
+        self.lobFiles=lobFiles # the LobFilePool of the parser
     
     def __str__(self):
         return self.fp+'.'+str(self.offset)+'.'+str(self.objlen)
+    
+    def toLLS(self):
+        """
+        Return the DB2 lob location specifier (file.offset.length/) used by LOAD.
+        """
+        return str(self)+'/'
 
     def __repr__(self):
         s="LobLocator('"+self.fp+"',"+str(self.offset)+","+str(self.objlen)
@@ -312,11 +478,760 @@ class LobLocator:
         s=s+")"
         return s
     
+    def getLobFile(self):
+        """
+        Return the (file,mmap) of the lob file and a flag set if the file
+        has to be closed by the caller (no lob file pool).
+        """
+        if self.lobFiles is not None:
+            return (self.lobFiles.getHandle(self.fp,self.lobFolder),False)
+        return ((open(findLobFile(self.fp,self.lobFolder),"rb"),None),True)
+    
+    def copyTo(self,out,targetEncoding=None,chunkSize=1024*1024,errors='strict',data=None):
+        """
+        Copy the lob data to the binary file out in chunks of chunkSize bytes,
+        the lob is never fully loaded in memory (unless it was prefetched, data
+        is then the prefetched lob data or it is found in the lob file pool).
+        Text lobs are transcoded from the lob encoding to targetEncoding when
+        the two are different, otherwise the bytes are copied by the kernel
+        (copy_file_range or sendfile) when possible.
+        Return the number of bytes written.
+        """
+        transcode=self.encoding and targetEncoding and \
+            codecs.lookup(self.encoding).name!=codecs.lookup(targetEncoding).name
+        if data is None and self.lobFiles is not None:
+            data=self.lobFiles.getPrefetched(self.fp,self.offset,self.objlen,self.lobFolder)
+        if data is not None:
+            if transcode:
+                data=codecs.decode(data,self.encoding,errors).encode(targetEncoding)
+            out.write(data)
+            return len(data)
+        h,owned=self.getLobFile()
+        try:
+            if not transcode:
+                return copyFilePart(h,self.offset,self.objlen,out,chunkSize)
+            dec=codecs.getincrementaldecoder(self.encoding)(errors)
+            enc=codecs.getincrementalencoder(targetEncoding)()
+            written=0
+            for chunk in readFileChunks(h,self.offset,self.objlen,chunkSize):
+                written+=out.write(enc.encode(dec.decode(chunk)))
+            written+=out.write(enc.encode(dec.decode(b'',True),True))
+            return written
+        finally:
+            if owned:
+                h[0].close()
+    
     def getLobData(self,trace=False):
         if self.encoding:
-            return readFilePart(self.fp, self.offset, self.objlen,self.lobFolder,trace).decode(self.encoding)
-        return readFilePart(self.fp, self.offset, self.objlen,self.lobFolder,trace)
+            return readFilePart(self.fp, self.offset, self.objlen,self.lobFolder,trace,self.lobFiles).decode(self.encoding)
+        return readFilePart(self.fp, self.offset, self.objlen,self.lobFolder,trace,self.lobFiles)
+
+def readFileChunks(h,offset,length,chunkSize=1024*1024):
+    """
+    Yield the length bytes starting at offset of the (file,mmap) h in chunks of chunkSize bytes.
+    """
+    fin,mm=h
+    end=offset+length
+    if mm is None:
+        fin.seek(offset,0)
+    while offset<end:
+        n=min(chunkSize,end-offset)
+        chunk=mm[offset:offset+n] if mm is not None else fin.read(n)
+        if not chunk:
+            break
+        offset+=len(chunk)
+        yield chunk
+
+# the kernel copy functions (in file,out file,length,in file offset) available on this system
+kernelCopyFunctions=[]
+if hasattr(os,'copy_file_range'):
+    kernelCopyFunctions.append(lambda ifd,ofd,n,off:os.copy_file_range(ifd,ofd,n,off))
+if hasattr(os,'sendfile'):
+    kernelCopyFunctions.append(lambda ifd,ofd,n,off:os.sendfile(ofd,ifd,off,n))
+
+class FileRangeWriter:
+    """
+    A binary file like object writing at a given offset of an open file
+    (os.pwrite), so that several threads can write their own reserved range
+    of the same file.
+    """
+    def __init__(self,fout,offset):
+        self.fd=fout.fileno()
+        self.pos=offset
+    
+    def write(self,data):
+        view=memoryview(data)
+        n=0
+        while n<len(view):
+            n+=os.pwrite(self.fd,view[n:],self.pos+n)
+        self.pos+=n
+        return n
+
+def copyFilePart(h,offset,length,out,chunkSize=1024*1024):
+    """
+    Copy length bytes starting at offset of the (file,mmap) h to the binary file out.
+    The copy is done in the kernel (os.copy_file_range, os.sendfile) when
+    available, with chunked reads and writes otherwise.
+    Return the number of bytes copied.
+    """
+    done=0
+    try:
+        out.flush()
+        ifd=h[0].fileno()
+        ofd=out.fileno()
+    except (AttributeError,OSError,io.UnsupportedOperation):
+        ifd=None
+    if ifd is not None:
+        for kcopy in kernelCopyFunctions:
+            try:
+                while done<length:
+                    n=kcopy(ifd,ofd,length-done,offset+done)
+                    if not n:
+                        return done
+                    done+=n
+                return done
+            except OSError:
+                pass # not supported for these files, try the next one
+    for chunk in readFileChunks(h,offset+done,length-done,chunkSize):
+        done+=out.write(chunk)
+    return done
+
+class LobDigestWriter:
+    """
+    A write only binary file computing the digest and the size of the
+    data written, the data is also written to the binary file out if provided.
+    """
+    def __init__(self,hashName='sha256',out=None):
+        self.hash=hashlib.new(hashName)
+        self.size=0
+        self.out=out
+    
+    def write(self,data):
+        self.hash.update(data)
+        self.size+=len(data)
+        if self.out is not None:
+            self.out.write(data)
+        return len(data)
+
+# the compressed file suffixes and the stdlib opener of their format (gzip at the level of the gzip command)
+compressedOpeners={'.gz':lambda path,mode:gzip.open(path,mode,compresslevel=6),'.bz2':bz2.open,'.xz':lzma.open}
+compressedFileTypes=(gzip.GzipFile,bz2.BZ2File,lzma.LZMAFile)
+
+def splitCompressedSuffix(path):
+    """
+    Split a file path in (path without the compression suffix, compression suffix),
+    the suffix is '' for the uncompressed files.
+    """
+    base,ext=os.path.splitext(path)
+    if ext.lower() in compressedOpeners:
+        return base,ext.lower()
+    return path,''
+
+def openInputFile(inp):
+    """
+    Open an input file for binary reading, the .gz, .bz2 and .xz
+    files are decompressed while they are read.
+    """
+    suffix=splitCompressedSuffix(inp)[1]
+    if suffix:
+        return compressedOpeners[suffix](inp,'rb')
+    return open(inp,'rb')
+
+class CompressedFileWriter(io.RawIOBase):
+    """
+    A write only binary file compressing the data written in a separate thread,
+    so the compression overlaps with the parsing. The written chunks are
+    passed to the thread through a bounded queue (queueSize chunks),
+    a compression error is raised by the next write or by close.
+    """
+    def __init__(self,path,opener,queueSize=8):
+        io.RawIOBase.__init__(self)
+        self.chunks=queue.Queue(queueSize)
+        self.error=None
+        self.fout=opener(path,'wb')
+        self.thread=threading.Thread(target=self.compressChunks,name='compress:'+os.path.basename(path),daemon=True)
+        self.thread.start()
+    
+    def compressChunks(self):
+        try:
+            while True:
+                chunk=self.chunks.get()
+                if chunk is None:
+                    break
+                self.fout.write(chunk)
+        except BaseException as x:
+            self.error=x
+            # unblock the writers waiting on a full queue
+            while self.chunks.get() is not None:
+                pass
+        finally:
+            try:
+                self.fout.close()
+            except BaseException as x:
+                self.error=self.error or x
+    
+    def checkError(self):
+        if self.error is not None:
+            raise IOError("Compression failed: "+repr(self.error)) from self.error
+    
+    def writable(self):
+        return True
+    
+    def write(self,data):
+        self.checkError()
+        self.chunks.put(bytes(data))
+        return len(data)
+    
+    def close(self):
+        if not self.closed:
+            self.chunks.put(None)
+            self.thread.join()
+            io.RawIOBase.close(self)
+            self.checkError()
+
+class ReadAheadStream(io.RawIOBase):
+    """
+    A read only binary stream reading the wrapped stream in a separate thread,
+    so the input reads overlap with the parsing. The thread reads blocks of
+    blockSize bytes into a bounded queue (queueSize blocks), it is started by
+    the first read so a seek before the first read does not read anything.
+    A read error of the thread is raised by the read that reaches it.
+    """
+    def __init__(self,stream,blockSize=4*1024*1024,queueSize=4):
+        io.RawIOBase.__init__(self)
+        self.stream=stream
+        self.blockSize=blockSize
+        self.queueSize=queueSize
+        self.blocks=None
+        self.thread=None
+        self.stopping=None # the stop event of the running thread
+        self.block=memoryview(b'')
+        self.blockPos=0
+        self.eof=False
+        self.pos=0
+        try:
+            self.pos=stream.tell()
+        except Exception:
+            pass
+    
+    def readBlocks(self,blocks,stopping):
+        """
+        The thread body, blocks and stopping are the queue and the stop event
+        of this thread: a stopped thread that is still in a read of the wrapped
+        stream ends without putting anything in a queue nobody reads.
+        """
+        def put(item):
+            while not stopping.is_set():
+                try:
+                    blocks.put(item,timeout=0.1)
+                    return True
+                except queue.Full:
+                    pass
+            return False
+        try:
+            while not stopping.is_set():
+                block=self.stream.read(self.blockSize)
+                if not put(block) or not block:
+                    break
+        except BaseException as x:
+            put(x)
+    
+    def startThread(self):
+        self.blocks=queue.Queue(self.queueSize)
+        self.stopping=threading.Event()
+        self.thread=threading.Thread(target=self.readBlocks,args=(self.blocks,self.stopping),name='readahead',daemon=True)
+        self.thread.start()
+    
+    def stopThread(self,wait=True):
+        """
+        Stop the read thread, without wait the thread may still finish a read
+        of the wrapped stream (a pipe waiting for its writer).
+        """
+        if self.thread is None:
+            return
+        self.stopping.set()
+        if wait:
+            self.thread.join()
+        self.thread=None
+        self.blocks=None
+    
+    def readable(self):
+        return True
+    
+    def readinto(self,view):
+        if self.blockPos>=len(self.block):
+            if self.eof:
+                return 0
+            if self.thread is None:
+                self.startThread()
+            block=self.blocks.get()
+            if isinstance(block,BaseException):
+                self.eof=True
+                raise block
+            if not block:
+                self.eof=True
+                return 0
+            self.block=memoryview(block)
+            self.blockPos=0
+        n=min(len(view),len(self.block)-self.blockPos)
+        view[:n]=self.block[self.blockPos:self.blockPos+n]
+        self.blockPos+=n
+        self.pos+=n
+        return n
+    
+    def tell(self):
+        return self.pos
+    
+    def seekable(self):
+        return self.stream.seekable()
+    
+    def seek(self,offset,whence=0):
+        self.stopThread()
+        if whence==1:
+            # the wrapped stream is ahead of pos by the blocks read in advance
+            offset,whence=self.pos+offset,0
+        self.pos=self.stream.seek(offset,whence)
+        self.block=memoryview(b'')
+        self.blockPos=0
+        self.eof=False
+        return self.pos
+    
+    def close(self):
+        """
+        Stop the read thread, the wrapped stream is not closed.
+        """
+        if not self.closed:
+            self.stopThread(wait=False)
+            io.RawIOBase.close(self)
+
+RECORD_TYPE_CHARS=tuple(chr(i) for i in range(256))
+
+def parseRecordHeader(hdr,headers):
+    """
+    Parse a record header (6 bytes length and 1 byte type) into a tuple (length,type).
+    Most records of a file share the same few headers, so the parsed
+    headers are kept in the headers dictionary of the feed.
+    """
+    rh=(int(hdr[:6]),RECORD_TYPE_CHARS[hdr[6]])
+    if len(headers)>4096:
+        headers.clear()
+    headers[hdr]=rh
+    return rh
+
+class IXFRecordFeed:
+    """
+    Base class for the IXF record readers used by IXFParser.
+
+    A record feed splits an input stream in IXF records. Each call to
+    readRecord returns a tuple (recordType,recordBody) where recordBody
+    is the record data that follows the record type byte, or None at the
+    end of the input.
+
+    The feeds that work on large memory windows (IXFBufferedFeed, IXFMmapFeed)
+    return the record body as a memoryview slice of their window, so
+    no data is copied until a field value is decoded.
+    """
+    ownsStream=False # the stream is a ReadAheadStream created by openRecordFeed
+    
+    def __init__(self,stream):
+        self.stream=stream
+
+    def readRecord(self):
+        raise NotImplementedError()
+
+    def tell(self):
+        """
+        Return the offset in the input of the next record.
+        """
+        return self.stream.tell()
+
+    def seek(self,offset):
+        """
+        Position the feed on the record that starts at the given input offset.
+        """
+        self.stream.seek(offset,0)
+
+    def close(self):
+        """
+        Release the feed resources, the wrapped stream is not closed
+        (only the read-ahead stream of the feed).
+        """
+        if self.ownsStream:
+            self.stream.close()
+
+class IXFStreamFeed(IXFRecordFeed):
+    """
+    The original record reader, each record is read from the stream
+    with three read calls (length, type and body).
+    """
+    def readRecord(self):
+        ln=self.stream.read(6)
+        if not ln or len(ln)<6:
+            return None
+        rt=self.stream.read(1)
+        if not rt:
+            return None
+        ln=int(ln)
+        return (rt.decode(),self.stream.read(ln-1))
+
+class IXFBufferedFeed(IXFRecordFeed):
+    """
+    Read the input in large blocks and return the records as views in
+    the current block. Used for input streams that can not be memory mapped
+    like stdin pipes.
+    The block is reused, a record view is valid only until the next
+    call of readRecord.
+    """
+    def __init__(self,stream,bufferSize=4*1024*1024):
+        IXFRecordFeed.__init__(self,stream)
+        self.buf=bytearray(bufferSize)
+        self.view=memoryview(self.buf)
+        self.pos=0
+        self.end=0
+        self.headers={}
+        self.offset=0 # the input offset of self.buf[0]
+        try:
+            self.offset=stream.tell()
+        except Exception:
+            pass
+
+    def readInto(self,view):
+        if hasattr(self.stream,'readinto'):
+            return self.stream.readinto(view)
+        chunk=self.stream.read(len(view))
+        view[:len(chunk)]=chunk
+        return len(chunk)
+
+    def fill(self,need):
+        """
+        Make sure at least need bytes are available from self.pos,
+        the unread part of the current block is moved to the start of the block.
+        Return False if the input ended before need bytes were available.
+        """
+        avail=self.end-self.pos
+        if avail>=need:
+            return True
+        if need>len(self.buf):
+            # a record larger than the block, views of the old block stay valid
+            nbuf=bytearray(max(need,2*len(self.buf)))
+            nbuf[:avail]=self.view[self.pos:self.end]
+            self.buf=nbuf
+            self.view=memoryview(nbuf)
+        else:
+            self.buf[:avail]=self.buf[self.pos:self.end]
+        self.offset+=self.pos
+        self.pos=0
+        self.end=avail
+        while self.end<need:
+            n=self.readInto(self.view[self.end:])
+            if not n:
+                break
+            self.end+=n
+        return self.end>=need
+
+    def readRecord(self):
+        pos=self.pos
+        if self.end-pos<7:
+            if not self.fill(7):
+                return None
+            pos=0
+        hdr=self.view[pos:pos+7].tobytes()
+        rh=self.headers.get(hdr)
+        if rh is None:
+            rh=parseRecordHeader(hdr,self.headers)
+        end=pos+6+rh[0]
+        if end>self.end:
+            self.fill(6+rh[0])
+            pos=0
+            end=min(6+rh[0],self.end)
+        self.pos=end
+        return (rh[1],self.view[pos+7:end])
+
+    def tell(self):
+        return self.offset+self.pos
+
+    def seek(self,offset):
+        self.stream.seek(offset,0)
+        self.offset=offset
+        self.pos=0
+        self.end=0
+
+class IXFMmapFeed(IXFRecordFeed):
+    """
+    Memory map the input file and return the records as views in the map.
+    Works only for regular (not empty) files.
+    """
+    def __init__(self,stream):
+        IXFRecordFeed.__init__(self,stream)
+        fno=stream.fileno()
+        if not stat.S_ISREG(os.fstat(fno).st_mode):
+            raise ValueError("Not a regular file")
+        self.pos=stream.tell()
+        self.mm=mmap.mmap(fno,0,access=mmap.ACCESS_READ)
+        self.view=memoryview(self.mm)
+        self.size=len(self.mm)
+        self.headers={}
+
+    def readRecord(self):
+        pos=self.pos
+        hdr=self.mm[pos:pos+7]
+        rh=self.headers.get(hdr)
+        if rh is None:
+            if len(hdr)<7:
+                return None
+            rh=parseRecordHeader(hdr,self.headers)
+        end=pos+6+rh[0]
+        if end>self.size:
+            end=self.size
+        self.pos=end
+        return (rh[1],self.view[pos+7:end])
+
+    def tell(self):
+        return self.pos
+
+    def seek(self,offset):
+        self.pos=offset
+
+    def close(self):
+        try:
+            self.view.release()
+            self.mm.close()
+        except BufferError:
+            # views of the map are still referenced, the map is released with them
+            pass
+
+def openRecordFeed(feed,readerMode='auto',bufferSize=4*1024*1024,readAhead=0):
+    """
+    Wrap an input stream in a record feed.
+    readerMode can be:
+      auto     - mmap for regular uncompressed files, buffered otherwise (default)
+      mmap     - memory map the input file
+      buffered - read the input in blocks of bufferSize bytes
+      stream   - read each record with separate read calls
+    With readAhead>0 (not for mmap) the input is read by a thread, readAhead
+    blocks of bufferSize bytes in advance (see ReadAheadStream), and auto is buffered.
+    """
+    if isinstance(feed,IXFRecordFeed):
+        return feed
+    if isinstance(feed,io.TextIOBase):
+        feed=feed.buffer
+    if readAhead>0 and readerMode!='mmap':
+        rfeed=openRecordFeed(ReadAheadStream(feed,bufferSize,readAhead),'stream' if readerMode=='stream' else 'buffered',bufferSize)
+        rfeed.ownsStream=True
+        return rfeed
+    if readerMode in ('auto','mmap') and not isinstance(feed,compressedFileTypes):
+        try:
+            return IXFMmapFeed(feed)
+        except (AttributeError,OSError,ValueError,io.UnsupportedOperation) as x:
+            if readerMode=='mmap':
+                print("Unable to memory map the input, using a buffered reader:",x,file=sys.stderr)
+    if readerMode=='stream':
+        return IXFStreamFeed(feed)
+    return IXFBufferedFeed(feed,bufferSize)
+
+class IXFRecordLayout:
+    """
+    A record layout (list of field lengths) compiled in a struct.Struct unpacker.
+    Splitting a record returns the fixed size fields (as bytes) followed by
+    the variable part of the record (the tail) in a single unpack_from call.
+    """
+    def __init__(self,lengths):
+        self.lengths=[int(ln) for ln in lengths]
+        self.struct=struct.Struct(''.join('%ds' % ln for ln in self.lengths))
+        self.size=self.struct.size
+
+    def split(self,data,offset=0):
+        """
+        Return the list of fields of data (starting from offset) followed by the tail.
+        Records shorter than the layout are split field by field,
+        the missing fields are returned as short or empty values.
+        """
+        if len(data)-offset>=self.size:
+            items=list(self.struct.unpack_from(data,offset))
+            items.append(data[offset+self.size:])
+            return items
+        items=[]
+        off=offset
+        for ln in self.lengths:
+            items.append(bytes(data[off:off+ln]))
+            off+=ln
+        items.append(data[off:])
+        return items
+
+class IXFRowIndex:
+    """
+    A sparse row index of an IXF file, the byte offset of the first 'D' record
+    of a row is kept every interval rows (rows 1, 1+interval, 1+2*interval...).
+    
+    The index is saved in a sidecar file (the IXF file path + '.ixfidx'):
+      header     - magic, IXF file size and mtime (ns), interval, offset of the
+                   first 'D' record, row count and the schema length
+      schema     - the IXF header and the table definition (JSON, utf-8)
+      entries    - (row number, offset) pairs, 8 bytes unsigned each
+    The index is valid only for the IXF file with the same size and mtime.
+    """
+    magic=b'IXFIDX01'
+    suffix='.ixfidx'
+    headerStruct=struct.Struct('<8sQqIQQI')
+    entryStruct=struct.Struct('<QQ')
+    
+    def __init__(self,interval=1000):
+        self.interval=interval
+        self.sourceSize=0
+        self.sourceMtime=0
+        self.dataStart=None
+        self.rowCount=0
+        self.schema=None
+        self.rows=[]
+        self.offsets=[]
+    
+    def addRow(self,offset):
+        """
+        Register the start offset of the next row.
+        """
+        if self.dataStart is None:
+            self.dataStart=offset
+        if self.rowCount%self.interval==0:
+            self.rows.append(self.rowCount+1)
+            self.offsets.append(offset)
+        self.rowCount+=1
+    
+    def findRow(self,rowNum):
+        """
+        Return (row number,offset) of the closest indexed row at or before rowNum,
+        (None,None) if the index has no entries.
+        """
+        i=bisect.bisect_right(self.rows,rowNum)-1
+        if i<0:
+            if not self.rows:
+                return (None,None)
+            i=0
+        return (self.rows[i],self.offsets[i])
     
+    def setSource(self,ixfPath):
+        st=os.stat(ixfPath)
+        self.sourceSize=st.st_size
+        self.sourceMtime=st.st_mtime_ns
+    
+    def isValidFor(self,ixfPath):
+        st=os.stat(ixfPath)
+        return st.st_size==self.sourceSize and st.st_mtime_ns==self.sourceMtime
+    
+    def write(self,path):
+        schema=json.dumps(self.schema,sort_keys=True).encode('utf-8')
+        with open(path,'wb') as out:
+            out.write(self.headerStruct.pack(
+                self.magic,self.sourceSize,self.sourceMtime,self.interval,
+                self.dataStart or 0,self.rowCount,len(schema)
+            ))
+            out.write(schema)
+            out.write(b''.join(self.entryStruct.pack(rn,off) for rn,off in zip(self.rows,self.offsets)))
+    
+    def read(self,path):
+        with open(path,'rb') as fin:
+            data=fin.read()
+        hs=self.headerStruct.size
+        if len(data)<hs:
+            raise ValueError("Truncated index file")
+        (magic,self.sourceSize,self.sourceMtime,self.interval,
+         self.dataStart,self.rowCount,schemaLen)=self.headerStruct.unpack_from(data)
+        if magic!=self.magic:
+            raise ValueError("Not an IXF row index file")
+        self.schema=json.loads(data[hs:hs+schemaLen].decode('utf-8'))
+        entries=list(self.entryStruct.iter_unpack(data[hs+schemaLen:]))
+        self.rows=[e[0] for e in entries]
+        self.offsets=[e[1] for e in entries]
+        return self
+
+def dpdDecletValue(d):
+    """
+    Return the value (0-999) of the densely packed decimal declet d (10 bits).
+    """
+    b=[(d>>i)&1 for i in range(10)]
+    hi=(d>>7)&7
+    mid=(d>>4)&7
+    lo=d&7
+    if not b[3]:
+        return hi*100+mid*10+lo
+    sel=(d>>1)&3
+    if sel==0:
+        return hi*100+mid*10+8+b[0]
+    if sel==1:
+        return hi*100+(8+b[4])*10+(b[6]*4+b[5]*2+b[0])
+    if sel==2:
+        return (8+b[7])*100+mid*10+(b[9]*4+b[8]*2+b[0])
+    sel=(d>>5)&3
+    if sel==0:
+        return (8+b[7])*100+(8+b[4])*10+(b[9]*4+b[8]*2+b[0])
+    if sel==1:
+        return (8+b[7])*100+(b[9]*4+b[8]*2+b[4])*10+8+b[0]
+    if sel==2:
+        return hi*100+(8+b[4])*10+8+b[0]
+    return (8+b[7])*100+(8+b[4])*10+8+b[0]
+
+# the value of the 1024 densely packed decimal declets
+dpdDeclets=[dpdDecletValue(d) for d in range(1024)]
+
+def decodeDecFloat(v,nbytes,dpd=True):
+    """
+    Decode the IEEE 754 decimal64 (nbytes=8) or decimal128 (nbytes=16) number
+    whose bits are the int v, the coefficient is encoded in densely packed
+    decimal (dpd, the decNumber encoding used by DB2) or in binary (BID).
+    Return a decimal.Decimal (Infinity and NaN included).
+    """
+    nbits=nbytes*8
+    ecbits=8 if nbytes==8 else 12 # exponent continuation bits
+    bias=398 if nbytes==8 else 6176
+    sign='-' if v>>(nbits-1) else ''
+    comb=(v>>(nbits-6))&0x1f
+    if comb==0x1e:
+        return decimal.Decimal(sign+'Infinity')
+    if comb==0x1f:
+        return decimal.Decimal(sign+('sNaN' if (v>>(nbits-7))&1 else 'NaN'))
+    if dpd:
+        if comb>>3==3:
+            exp=(comb>>1)&3
+            coef=8+(comb&1)
+        else:
+            exp=comb>>3
+            coef=comb&7
+        ccbits=nbits-6-ecbits
+        exp=((exp<<ecbits)|((v>>ccbits)&((1<<ecbits)-1)))-bias
+        for shift in range(ccbits-10,-1,-10):
+            coef=coef*1000+dpdDeclets[(v>>shift)&0x3ff]
+    else:
+        ebits=ecbits+2
+        if comb>>3==3:
+            cbits=nbits-3-ebits
+            coef=(4<<cbits)|(v&((1<<cbits)-1))
+        else:
+            cbits=nbits-1-ebits
+            coef=v&((1<<cbits)-1)
+        exp=((v>>cbits)&((1<<ebits)-1))-bias
+        if coef>=10**(16 if nbytes==8 else 34):
+            coef=0 # non canonical coefficient
+    return decimal.Decimal(sign+str(coef)+'E'+str(exp))
+
+def loadRowIndex(ixfPath,trace=False):
+    """
+    Return the row index of the ixfPath file from its sidecar file
+    or None if there is no index or the index is not valid for the file.
+    """
+    idxPath=ixfPath+IXFRowIndex.suffix
+    if not os.path.isfile(idxPath):
+        return None
+    try:
+        rowIndex=IXFRowIndex().read(idxPath)
+    except Exception as x:
+        print("Invalid row index:",idxPath,x,file=sys.stderr)
+        return None
+    if not rowIndex.isValidFor(ixfPath):
+        print("Ignoring outdated row index (file size or time changed):",idxPath,file=sys.stderr)
+        return None
+    if trace:
+        print("Using row index:",idxPath,file=sys.stderr)
+    return rowIndex
+
 class IXFParser:
     """
     A reusable component used by the main method to implement the tool's logic. 
@@ -391,7 +1306,8 @@ class IXFParser:
                ['IXFDFIL1',4,'reserved'],
                ['IXFDCOLS',0,'columnar data'],
            ],
-            "parser":"parseRowDataIXFRecord"
+            "parser":"parseRowDataIXFRecord",
+            "zeroCopy":True # the columnar data is passed as a memoryview
         },
         'A':{
             "fields":[
@@ -407,7 +1323,8 @@ class IXFParser:
     # 0 variable length the length is the first 2 bytes in ther data
     # -1 fixed length the column data_len is the storage length
     # -2 computed value from the column and type info 
-    # -4 lob/clob
+    # -4 lob/clob the length is the first 4 bytes in the data
+    # nullable columns have a 2 bytes null indicator before the data (0xFFFF for null)
     # blob locators '960','916'
     # clob locators '964','968','920','924'
     typeInfo={
@@ -423,7 +1340,7 @@ class IXFParser:
         '924':{'name':'DBCLOB_FILE','length':-1,'parser':'parseDataLob'},
         '452':{'name':'CHAR','length':-1,'parser':'parseDataChars'},
         '384':{'name':'DATE','length':10,'parser':'parseDataChars'},
-        '412':{'name':'DBCLOB','length':0,'parser':'parseDataLob'},
+        '412':{'name':'DBCLOB','length':-4,'parser':'parseDataLob'},
         '484':{'name':'DECIMAL','length':-2,'parser':'parseDataNum'},
         '996':{'name':'DECFLOAT','length':-2,'parser':'parseDataNum'},
         '480':{'name':'FLOATING POINT','length':-2,'parser':'parseFloat'},
@@ -434,19 +1351,101 @@ class IXFParser:
         '500':{'name':'SMALLINT','length':2,'parser':'parseSmallInt'},
         '388':{'name':'TIME','length':8,'parser':'parseDataChars'},
         '392':{'name':'TIMESTAMP','length':-2,'parser':'parseDataChars'},
-        '908':{'name':'VARBINARY','length':0,'parser':'parseDataVarLen'},
+        '908':{'name':'VARBINARY','length':0,'parser':'parseDataRaw'},
         '448':{'name':'VARCHAR','length':0,'parser':'parseDataVarLen'},
         '464':{'name':'VARGRAPHIC','length':0,'parser':'parseDataVarLen'},
-        '988':{'name':'XML','length':-4,'parser':'parseDataXML'},
+        '988':{'name':'XML','length':0,'parser':'parseDataXML'},
     }
     
+    binaryTypes=('912','908') # BINARY, VARBINARY
+    bitDataTypes=('452','448','456') # CHAR, VARCHAR and LONG VARCHAR can be FOR BIT DATA
+    
+    # DB2 code pages (as found in the H and C records) and their python codecs
     dbCodePageToPythonCodePageMap={
-        '01200':'UTF-8',
-        '01208':'UTF-8'
+        # unicode
+        '01200':'utf_16_be', # UTF-16 (graphic data)
+        '13488':'utf_16_be', # UCS-2 (graphic data)
+        '01208':'utf_8',
+        # ASCII based single byte
+        '00367':'ascii',
+        '00437':'cp437',
+        '00737':'cp737',
+        '00775':'cp775',
+        '00813':'iso8859_7',
+        '00819':'latin_1',
+        '00850':'cp850',
+        '00852':'cp852',
+        '00855':'cp855',
+        '00856':'cp856',
+        '00857':'cp857',
+        '00858':'cp858',
+        '00860':'cp860',
+        '00861':'cp861',
+        '00862':'cp862',
+        '00863':'cp863',
+        '00864':'cp864',
+        '00865':'cp865',
+        '00866':'cp866',
+        '00869':'cp869',
+        '00874':'cp874',
+        '00878':'koi8_r',
+        '00912':'iso8859_2',
+        '00915':'iso8859_5',
+        '00916':'iso8859_8',
+        '00920':'iso8859_9',
+        '00923':'iso8859_15',
+        '01089':'iso8859_6',
+        '01250':'cp1250',
+        '01251':'cp1251',
+        '01252':'cp1252',
+        '01253':'cp1253',
+        '01254':'cp1254',
+        '01255':'cp1255',
+        '01256':'cp1256',
+        '01257':'cp1257',
+        '01258':'cp1258',
+        '01275':'mac_roman',
+        # ASCII based double byte and mixed
+        '00932':'cp932',
+        '00943':'cp932',
+        '00954':'euc_jp',
+        '05039':'shift_jis',
+        '00949':'cp949',
+        '00970':'euc_kr',
+        '01363':'cp949',
+        '00950':'cp950',
+        '01370':'cp950',
+        '01381':'gb2312',
+        '01383':'gb2312',
+        '01386':'gbk',
+        '01392':'gb18030',
+        '05488':'gb18030',
+        # EBCDIC
+        '00037':'cp037',
+        '00273':'cp273',
+        '00424':'cp424',
+        '00500':'cp500',
+        '00875':'cp875',
+        '01026':'cp1026',
+        '01140':'cp1140',
+    }
+    
+    # graphic types, their data is encoded with the double byte code page
+    # and their lengths are counted in double byte characters
+    graphicTypes=('468','464','472','412','968','924')
+    
+    # the lob output strategies (ouputLobStrategy) and the methods writing the lobs
+    lobStrategies={
+        'detached':'writeDetachedLob',
+        'packed':'writePackedLob',
+        'hash':'writeHashLob',
+        'reference':'writeReferenceLob',
     }
     
     def __init__(self,**args):
         self.endianism='<'
+        self.decimalFormat=args.get('decimalFormat',None) or 'decimal'
+        self.decfloatEncoding=args.get('decfloatEncoding',None) or 'dpd'
         self.tableDefProcessed=False
         self.tableDef={
             'name':None,
@@ -455,6 +1454,7 @@ class IXFParser:
         }
         self.aRecords=[]
         self.inputEncoding=args.get('inputEncoding',None)
+        self.decodeErrors=args.get('decodeErrors','replace')
         self.outputEncoding=args.get('outputEncoding',"UTF-8")
         self.ixfHeader={}
         self.columns=[]
@@ -470,6 +1470,40 @@ class IXFParser:
         self.maxLobSize=-1
         self.traceRecords=args.get('trace',False)
         self.lobFolder=args.get('lobFolder','.')
+        self.lobStrategy=args.get('ouputLobStrategy',None) or args.get('outputLobStrategy',None) or 'detached'
+        if self.lobStrategy not in self.lobStrategies:
+            raise Exception("Invalid lob output strategy:"+self.lobStrategy)
+        self.lobWriter=getattr(self,self.lobStrategies[self.lobStrategy])
+        self.lobPackScope=args.get('lobPackScope',None) or 'column'
+        self.lobPackSize=int(args.get('lobPackSize',None) or 1024*1024*1024)
+        self.lobContainers={} # packed lob containers: scope -> [file,file name,size,sequence]
+        self.outputPart=args.get('outputPart',None) # the part number of a parallel conversion
+        self.lobHash=args.get('lobHash',None) or 'sha256'
+        self.lobHashBuffer=int(args.get('lobHashBuffer',None) or 16*1024*1024)
+        self.lobDigests=set() # the digests of the lobs written by the hash strategy
+        self.lobBytesSaved=0
+        self.lobPaths={} # (lob folder,lob file) -> absolute lob file path, for the reference strategy
+        # the lobs are written by lobWorkers threads while the rows are parsed,
+        # at most lobBytesInFlight bytes are waiting to be written
+        self.lobWorkers=int(args.get('lobWorkers',None) or 0)
+        self.lobBytesInFlight=int(args.get('lobBytesInFlight',None) or 64*1024*1024)
+        self.lobExecutor=None
+        self.lobJobs=[]
+        self.lobJobErrors=0
+        self.lobInFlight=0
+        self.lobCond=threading.Condition()
+        self.lobClosedContainers=[] # packed containers full but still written by lob jobs
+        self.lobThreadFiles=threading.local() # the LobFilePool of each lob writer thread
+        self.lobThreadPools=[]
+        # the open lob files, lobHandles files at most, memory mapped if lobMmap is y
+        self.lobFiles=LobFilePool(
+            int(args.get('lobHandles',None) or 16),
+            args.get('lobMmap','y') not in ('n',False),
+            int(args.get('lobCoalesceGap',None) or 64*1024)
+        )
+        # the rows are written by batches of lobBatchRows rows, the lobs of a batch are prefetched
+        self.lobBatchRows=int(args.get('lobBatchRows',None) or 0)
+        self.lobBatch=[] # the (rowNum,row) of the current batch
         self.outObj=args.get('out',None)
         self.output=None
         self.csvwriter=None
@@ -477,10 +1511,24 @@ class IXFParser:
         self.maxRows=args.get('maxRows','-1')
         self.fromRow=0 if self.fromRow is None else int(self.fromRow)
         self.maxRows=-1 if self.maxRows is None else int(self.maxRows)
+        self.readerMode=args.get('readerMode','auto') or 'auto'
+        self.readBufferSize=int(args.get('readBufferSize',None) or 4*1024*1024)
+        self.readAhead=int(args.get('readAhead',None) or 0) # input blocks read in advance by a thread
+        self.ixfPath=args.get('ixfPath',None) # the IXF file path, used to find the row index
+        self.useIndex=args.get('useIndex','y') not in ('n',False)
+        self.indexInterval=int(args.get('indexInterval',None) or 1000)
+        self.rowIndex=None
+        # output the table header (csv column names, json list start) and footer,
+        # used by the parallel conversion where each worker writes a part of the output
+        self.outputHeader=args.get('outputHeader',True)
+        self.outputFooter=args.get('outputFooter',True)
         self.outputColumns=args.get("columns",None)
         if self.outputColumns:
             self.outputColumns=self.outputColumns.split(',')
         self.rowFilter=args.get("filter",None)
+        self.filterColumns=None
+        self.filterCid=None
+        self.rowAccepted=None
         if self.rowFilter:
             if os.path.isfile(self.rowFilter):
                 try:
@@ -495,12 +1543,18 @@ class IXFParser:
                         print("Your row filter object called rowfilter is not a function!",file=sys.stderr)
                         sys.exit(1)
                     self.rowFilter=f
+                    # optional: the columns used by the filter, the filter is called as
+                    # soon as these are decoded and the rest of a rejected row is not decoded
+                    self.filterColumns=globs.get('filtercolumns',None)
                     print("Using row filter from file:",self.rowFilter,file=sys.stderr)
                 except Exception as x:
                     traceback.print_exc(file=sys.stderr)
                     sys.exit(1)
         
         # bind all record parsers to methods of this class
+        # (on instance copies, the class level definitions are shared by all parsers)
+        self.recordTypes={k:dict(v) for k,v in self.recordTypes.items()}
+        self.typeInfo={k:dict(v) for k,v in self.typeInfo.items()}
         for k in self.recordTypes:
             rt=self.recordTypes[k]
             pdn=rt['parser']
@@ -519,16 +1573,47 @@ class IXFParser:
             #     print("Data type:",k," Using parser=",td['parser'],file=sys.stderr)
     
     def acceptCurrentRow(self):
+        """
+        Apply the row filter to the current row, the filter is called once
+        for each row (the result is kept until the next row starts).
+        """
         if self.rowFilter:
+            if self.rowAccepted is not None:
+                return self.rowAccepted
+            self.rowAccepted=True
             try:
                 ar=self.rowFilter(self.currentRow)
                 if not ar:
                     self.filteredRowCount+=1
-                return ar
+                self.rowAccepted=bool(ar)
             except Exception as x:
                 traceback.print_exc(file=sys.stderr)
+            return self.rowAccepted
         return True
     
+    def getFilterCid(self):
+        """
+        Return the last 'D' record identifier holding a column declared in the
+        filtercolumns list of the row filter module (column names or 1 based indexes),
+        None if the filter did not declare its columns.
+        """
+        if not self.filterColumns:
+            return None
+        cids=[]
+        for cv in self.filterColumns:
+            if type(cv)==int:
+                if cv<1 or cv>len(self.columns):
+                    print("Invalid filter column index:",cv,file=sys.stderr)
+                    return None
+                cids.append(self.columns[cv-1]['cid'])
+                continue
+            cd=[x for x in self.columns if x['name']==cv]
+            if not cd:
+                print("Invalid filter column name:",cv,file=sys.stderr)
+                return None
+            cids.append(cd[0]['cid'])
+        return max(cids)
+    
     def onTableDef(self):
         """
         Override in the derived class  
@@ -571,13 +1656,64 @@ class IXFParser:
         """
         Override in the derived class  
         Process a data row if an output was defined
+        The self.currentRow list is reused for the next row, copy it
+        (tuple(self.currentRow)) to keep the row.
         """
         return self.acceptCurrentRow()
         
     def onLastRecord(self):
         """
-        Override in the derived class  
+        Override in the derived class (and call this method)
+        Wait for the lob writer jobs and close the lob files opened while
+        reading and writing the lobs.
+        """
+        try:
+            self.joinLobJobs()
+        finally:
+            self.lobFiles.close()
+            for lc in self.lobContainers.values():
+                lc[0].close()
+            self.lobContainers={}
+            for f in self.lobClosedContainers:
+                f.close()
+            self.lobClosedContainers=[]
+    
+    def batchLobRow(self):
+        """
+        Add the current row to the lob batch if lobBatchRows is set, the batch
+        is written (flushLobBatch) when full.
+        Return False if the row is not batched and has to be written now.
+        """
+        if self.lobBatchRows<=1:
+            return False
+        self.lobBatch.append((self.rowNum,list(self.currentRow)))
+        if len(self.lobBatch)>=self.lobBatchRows:
+            self.flushLobBatch()
+        return True
+    
+    def flushLobBatch(self):
+        """
+        Prefetch the lobs of the rows of the lob batch (LobFilePool.prefetch)
+        then write the rows (writeRow) in order.
         """
+        if not self.lobBatch:
+            return
+        if self.lobStrategy!='reference': # the lobs are not read
+            self.lobFiles.prefetch([v for rn,row in self.lobBatch for v in row if type(v) == LobLocator])
+        rowNum,currentRow=self.rowNum,self.currentRow
+        try:
+            for self.rowNum,self.currentRow in self.lobBatch:
+                self.writeRow()
+        finally:
+            self.lobBatch=[]
+            self.lobFiles.dropPrefetched()
+            self.rowNum,self.currentRow=rowNum,currentRow
+    
+    def writeRow(self):
+        """
+        Override in the derived class using batchLobRow: write the current row.
+        """
+        pass
     
     def beforeFirstRow(self):
         """
@@ -594,6 +1730,12 @@ class IXFParser:
                 self.colcidmap[cid]=cim
             else:
                 cim.append(cd)
+        self.decodePlan=self.buildDecodePlan()
+        self.lobColumns=[cidx for cidx in range(len(self.columns)) if self.isLobType(cidx)]
+        # the row list reused for all the rows, reset from nullRow when a row starts
+        self.rowBuffer=[None]*self.columnCount
+        self.nullRow=(None,)*self.columnCount
+        self.filterCid=self.getFilterCid()
         if self.traceRecords:
             print("New table definition received:",
                   json.dumps(self.tableDef,indent=' ',sort_keys=True),
@@ -604,44 +1746,253 @@ class IXFParser:
     def getColset(self,cid):
         return self.colcidmap.get(cid)
     
-    def parseDataNum(self,coldef,data):
-        # TODO: implement
-        return self.parseDataRaw(coldef,data)
-
-    def parseFloat(self,coldef,data):
-        if len(data) == 4:
-            return struct.unpack(self.endianism+'f',data)[0]
-        return struct.unpack(self.endianism+'d',data)[0]
-
-    def parseSmallInt(self,coldef,data):
-        return struct.unpack(self.endianism+'h',data)[0]
+    def buildDecodePlan(self):
+        """
+        Compile the table definition in a decode plan: for each 'D' record
+        identifier the list of (colno,decoder,coldef) of the columns stored
+        in that record. A decoder is a function receiving the 'D' record
+        columnar data and returning the column value (None for null values).
+        """
+        plan={}
+        for cid,colset in self.colcidmap.items():
+            plan[cid]=[(cd['colno'],self.getColumnDecoder(cd),cd) for cd in colset]
+        return plan
     
-    def parseDataInteger(self,coldef,data):
-        return struct.unpack(self.endianism+'i',data)[0]
-
-    def parseDataBigInteger(self,coldef,data):
-        return struct.unpack(self.endianism+'q',data)[0]
-
-    def parseDataVarLen(self,coldef,data):
+    def getColumnStorageLength(self,coldef,coltdef):
         """
+        Return the storage length of a column when it is known from the column
+        and type definitions or None if the length is stored with the data
+        (variable length and lob types, see getColumnDecoder).
+        DECIMAL: IXFCLENG is PPPSS (precision P, scale S), the length in bytes
+        of the packed decimal number is (P+2)/2.
+        DECFLOAT: 8 bytes for the 16 digit values, 16 bytes for the 34 digit values.
         """
-        #if self.traceRecords:print(">>>parse_varlen:",data,file=sys.stderr)
-        encoding=self.getColumnEncoding(coldef)      
-        try:
-            #return data[2:].decode(encoding)
-            return data.decode(encoding)
-        except Exception as x:
-            print("parseDataVarLen:error:",x,file=sys.stderr)
-            return data
+        tdlen=coltdef['length']
+        if tdlen>0:
+            return tdlen
+        tn=coltdef['name']
+        if tn =='GRAPHIC':
+            # the length is in double byte characters
+            return 2*coldef['data_len']
+        if tdlen==-1:
+            return coldef['data_len']
+        if tn =='FLOATING POINT':
+            return coldef['data_len']
+        if tn =='DECIMAL':
+            # IXFCLENG is PPPSS, the packed decimal is (P+2)/2 bytes
+            return (coldef['data_len']//100+2)//2
+        if tn == 'DECFLOAT':
+            return (8 if coldef['data_len']==16 else 16)
+        if tn == 'TIMESTAMP':
+            return 20+coldef['data_len']
+        return None
     
-    def getExternalLobIdentifier(self,lobColIdx):
+    numericParserFormats={
+        'parseSmallInt':'h',
+        'parseDataInteger':'i',
+        'parseDataBigInteger':'q',
+    }
+    
+    def getColumnDecoder(self,coldef):
         """
-        TODO: REPLACE THIS WITH YOUR OWN IMPL IF NEEDED
+        Return the decoder function of a column, everything that does not depend
+        on the row data is resolved here: the position in the 'D' record, the 
+        length strategy, the null indicator check and the character encoding.
+        A nullable column starts with a 2 bytes null indicator (0xFFFF for null)
+        followed by the column data.
+        The value is built by the parser of the column type, the default
+        character and numeric parsers are inlined in the decoder. 
+        """
+        td=self.typeInfo[coldef['type']]
+        parser=td['parser']
+        if self.isBitDataColumn(coldef):
+            parser=self.parseDataRaw
+        pos=coldef['pos']-1
+        npos=None
+        if coldef['nullable']=='Y':
+            npos=pos
+            pos+=2
+        ln=self.getColumnStorageLength(coldef,td)
         
-        If the table contains lobs that should be saved in independent files
-        then we need a way to name the lob file.
-        There are many ways to name/id the lob object and usually it is related to
-        other column values. For example if the row describes a person and the
+        if ln is not None:
+            end=pos+ln
+            def extract(data):
+                return data[pos:end]
+        elif td['length']==-4:
+            # lob data, the length is stored in the first 4 bytes
+            cw=self.getCharWidth(coldef)
+            def extract(data):
+                blen=data[pos:pos+4]
+                if len(blen)==4:
+                    ln=struct.unpack(self.endianism+'I',blen)[0]
+                else:
+                    ln=struct.unpack(self.endianism+'H',blen)[0]
+                return data[pos+4:pos+4+ln*cw]
+        else:
+            # variable length, the length is stored in the first 2 bytes
+            lenUnpack=struct.Struct(self.endianism+'H').unpack_from
+            dpos=pos+2
+            cw=self.getCharWidth(coldef)
+            if cw==1:
+                def extract(data):
+                    return data[dpos:dpos+lenUnpack(data,pos)[0]]
+            else:
+                def extract(data):
+                    return data[dpos:dpos+lenUnpack(data,pos)[0]*cw]
+        
+        pfunc=getattr(parser,'__func__',None)
+        pname=getattr(pfunc,'__name__',None)
+        if pfunc is getattr(IXFParser,pname,None) and pname in self.numericParserFormats:
+            valueUnpack=struct.Struct(self.endianism+self.numericParserFormats[pname]).unpack_from
+            def value(data):
+                return valueUnpack(data,pos)[0]
+        elif pfunc is IXFParser.parseDataNum:
+            numDecode=self.getNumDecoder(coldef)
+            def value(data):
+                return numDecode(extract(data))
+        elif pfunc in (IXFParser.parseDataChars,IXFParser.parseDataVarLen) and self.isRawColumn(coldef):
+            # the bytes are copied as they are (see IXFParserWriteCsvRaw)
+            if ln is not None:
+                def value(data):
+                    return bytes(data[pos:end])
+            else:
+                def value(data):
+                    return bytes(extract(data))
+        elif pfunc in (IXFParser.parseDataChars,IXFParser.parseDataVarLen):
+            # str() decodes in C (without the codecs wrapper call), the slices are inlined
+            encoding=codecs.lookup(self.getColumnEncoding(coldef)).name
+            errors=self.decodeErrors
+            if ln is not None:
+                def value(data):
+                    return str(data[pos:end],encoding,errors)
+            elif td['length']==0 and self.getCharWidth(coldef)==1:
+                def value(data):
+                    return str(data[dpos:dpos+lenUnpack(data,pos)[0]],encoding,errors)
+            else:
+                def value(data):
+                    return str(extract(data),encoding,errors)
+        else:
+            def value(data):
+                return parser(coldef,extract(data))
+        
+        if npos is None:
+            return value
+        def decode(data):
+            if data[npos]==0xff:
+                return None
+            return value(data)
+        return decode
+    
+    def isRawColumn(self,coldef):
+        """
+        Return True if the value of the character column coldef is kept as the
+        bytes of the 'D' record (not decoded), see IXFParserWriteCsvRaw.
+        """
+        return False
+    
+    def isBitDataColumn(self,coldef):
+        """
+        Return True for a FOR BIT DATA character column (code page 00000 for
+        both the single and double byte code pages), its values are bytes.
+        """
+        return coldef['type'] in self.bitDataTypes and not coldef.get('sbcodepage') and not coldef.get('dbcodepage')
+    
+    def isBinaryColumn(self,coldef):
+        """
+        Return True if the values of the column coldef are bytes (BINARY,
+        VARBINARY and FOR BIT DATA columns), written as hex strings.
+        """
+        return coldef['type'] in self.binaryTypes or self.isBitDataColumn(coldef)
+    
+    def parseDataNum(self,coldef,data):
+        """
+        Parse a DECIMAL or DECFLOAT value (see getNumDecoder).
+        """
+        return self.getNumDecoder(coldef)(data)
+    
+    def getNumDecoder(self,coldef):
+        """
+        Return the function decoding the storage bytes of a DECIMAL or DECFLOAT column.
+        
+        DECIMAL(P,S) is a packed decimal: P digits (with a leading 0 digit when P
+        is even) followed by the sign (0xB or 0xD for negative values), two digits
+        per byte. The value is an int when S is 0, a decimal.Decimal otherwise
+        (the canonical string with decimalFormat=str).
+        
+        DECFLOAT(16/34) is an IEEE 754 decimal64/decimal128 number stored in
+        the file byte order, decfloatEncoding is dpd (default) or bid.
+        The value is a decimal.Decimal (a string with decimalFormat=str).
+        """
+        asStr=self.decimalFormat=='str'
+        if coldef['type']=='996':
+            nbytes=8 if coldef['data_len']==16 else 16
+            byteorder='little' if self.endianism=='<' else 'big'
+            dpd=self.decfloatEncoding!='bid'
+            def decode(data):
+                v=decodeDecFloat(int.from_bytes(data,byteorder),nbytes,dpd)
+                return str(v) if asStr else v
+            return decode
+        
+        scale=coldef['data_len']%100
+        Decimal=decimal.Decimal
+        # the nibbles are converted to digits by bytes.hex, the last one is the sign
+        if scale==0:
+            def decode(data):
+                h=data.hex()
+                if h[-1] in 'bd':
+                    return -int(h[:-1])
+                return int(h[:-1])
+            return decode
+        if not asStr:
+            exp='E-%d' % scale
+            def decode(data):
+                h=data.hex()
+                if h[-1] in 'bd' and h[:-1].strip('0'):
+                    return Decimal('-'+h[:-1]+exp)
+                return Decimal(h[:-1]+exp)
+            return decode
+        def decode(data):
+            h=data.hex()
+            digits=h[:-1]
+            if not digits.isdigit():
+                raise ValueError("Invalid packed decimal:"+h)
+            ip=digits[:-scale].lstrip('0') or '0'
+            fp=digits[-scale:]
+            v=ip+'.'+fp
+            if h[-1] in 'bd' and (ip!='0' or fp.strip('0')):
+                v='-'+v
+            return v
+        return decode
+
+    def parseFloat(self,coldef,data):
+        if len(data) == 4:
+            return struct.unpack(self.endianism+'f',data)[0]
+        return struct.unpack(self.endianism+'d',data)[0]
+
+    def parseSmallInt(self,coldef,data):
+        return struct.unpack(self.endianism+'h',data)[0]
+    
+    def parseDataInteger(self,coldef,data):
+        return struct.unpack(self.endianism+'i',data)[0]
+
+    def parseDataBigInteger(self,coldef,data):
+        return struct.unpack(self.endianism+'q',data)[0]
+
+    def parseDataVarLen(self,coldef,data):
+        """
+        """
+        #if self.traceRecords:print(">>>parse_varlen:",data,file=sys.stderr)
+        encoding=self.getColumnEncoding(coldef)      
+        return str(data,encoding,self.decodeErrors)
+    
+    def getExternalLobIdentifier(self,lobColIdx):
+        """
+        TODO: REPLACE THIS WITH YOUR OWN IMPL IF NEEDED
+        
+        If the table contains lobs that should be saved in independent files
+        then we need a way to name the lob file.
+        There are many ways to name/id the lob object and usually it is related to
+        other column values. For example if the row describes a person and the
         row contains that person's name then we can use it to to generate an id for
         its picture stored as a jpeg file in a lob. The file extension (.jpg) may also
         depend on the lob type column (or maybe default for this table).
@@ -684,31 +2035,32 @@ class IXFParser:
         # is this a lob locator?
         if coldef['type'] in ('960', '964', '968','916', '920', '924'):
             #print('>>LOBLOC:',coldef['type']," lcdata:",data,file=sys.stderr)
-            lobloc=data[2:-1].decode(encoding)
+            # the locator is written in the file code page, not the lob one
+            lobloc=str(data[:-1],self.getIXFFileEncoding()) # remove the ending '/'
             llc=lobloc.split('.')
             fn=".".join(llc[0:-2])
             offset=int(llc[-2])
             objlen=int(llc[-1])
             self.totalLobSize+=objlen
             if coldef['type'] in ('964','968','920','924'):
-                lobLocator=LobLocator(fn,offset,objlen,self.lobFolder,encoding)
+                lobLocator=LobLocator(fn,offset,objlen,self.lobFolder,encoding,self.lobFiles)
                 if self.traceRecords:
                     print('>>LOBLOC_repr:',repr(lobLocator),file=sys.stderr)
                     print('>>LOBLOC     :',lobLocator,file=sys.stderr)
                     #print('>>CLOB:',lobLocator.getLobData(),file=sys.stderr)
             else:
-                lobLocator=LobLocator(fn,offset,objlen,self.lobFolder)
+                lobLocator=LobLocator(fn,offset,objlen,self.lobFolder,None,self.lobFiles)
                 if self.traceRecords:
                     print('>>LOBLOC_repr:',repr(lobLocator),file=sys.stderr)
                     print('>>LOBLOC     :',lobLocator,file=sys.stderr)
                     #print('>>BLOB:',lobLocator.getLobData(),file=sys.stderr)
             return lobLocator
         
-        if coldef['type'] == '408':
-            # is a CLOB file 
-            return data[2:].decode(encoding)
+        if coldef['type'] in ('408','412'):
+            # is a CLOB or DBCLOB file 
+            return str(data,encoding,self.decodeErrors)
         
-        return self.parseDataRaw(coldef,data[2:])
+        return self.parseDataRaw(coldef,data)
 
     def parseDataXML(self,coldef,data):
         """
@@ -717,13 +2069,13 @@ class IXFParser:
         """
         encoding=self.getColumnEncoding(coldef)      
         #print(">>XML locator raw:",data,file=sys.stderr)
-        xml_loc=data[3:].decode(encoding).split(' ')
+        xml_loc=str(data[3:],self.getIXFFileEncoding()).split(' ')
         #print(">>XML locator:",repr(xml_loc),file=sys.stderr)
         
         fn=xml_loc[1][5:-1]
         offset=int(xml_loc[2][5:-1])
         objlen=int(xml_loc[3][5:-1])
-        lobLocator=LobLocator(fn,offset,objlen,self.lobFolder,encoding)
+        lobLocator=LobLocator(fn,offset,objlen,self.lobFolder,encoding,self.lobFiles)
         self.totalLobSize+=objlen
         
         if self.traceRecords:
@@ -737,12 +2089,8 @@ class IXFParser:
         """
         """
         #print(">>>parse_chars:",data,file=sys.stderr)
-        try:
-            encoding=self.getColumnEncoding(coldef)      
-            return data.decode(encoding)
-        except Exception as x:
-            print("parseDataChars:error:",x,file=sys.stderr)
-            return data
+        encoding=self.getColumnEncoding(coldef)      
+        return str(data,encoding,self.decodeErrors)
     
     def parseInt(self,bstr,dv=0):
         """
@@ -750,43 +2098,54 @@ class IXFParser:
         """
         try:
             #return struct.unpack(self.endianism+'i',bstr)[0]
-            return int(bstr.decode(self.getIXFFileEncoding())) #TODO: default encoding 
+            # the IXF digits are always ASCII, int() parses them as bytes
+            return int(bytes(bstr))
         except:
             return dv
     
     def parseDataRaw(self,coldef,data):
         """
         A generic placeholder for a unspecified parser.
-        Returns data as is provided in the parameter.
+        Returns data as is provided in the parameter (as bytes).
         """
-        return data
+        return bytes(data)
     
-    def getIXFFileEncoding(self):
-        if self.inputEncoding:
-            return self.inputEncoding
-        
-        ixfCp=self.tableDef.get('dbcodepage',None)
-        if ixfCp is None:
-            ixfCp=self.tableDef.get('sbcodepage',None)
-        if ixfCp is None:
-            ixfCp=self.ixfHeader.get('dbcodepage',None)
-        if ixfCp is None:
-            ixfCp=self.ixfHeader.get('sbcodepage',None)
-        
-        if ixfCp is None:
-            ixfCp='01200'
-            if self.traceRecords:
-                print("WARNING! No code page found the IXF records, using the default:",ixfCp,file=sys.stderr)
-            
+    def getPythonCodePage(self,ixfCp):
+        """
+        Map a DB2 code page to a python codec name.
+        """
         cpn=self.dbCodePageToPythonCodePageMap.get(ixfCp,None)
         if cpn is None:
             raise Exception("Unable to map db-codepage:"+ixfCp+" to a python codepage")
         return cpn
+    
+    def getIXFFileEncoding(self,graphic=False):
+        """
+        The encoding of the IXF file is the single byte code page (or the
+        double byte code page for graphic data) of the Table header then
+        of the IXF header.
+        """
+        if self.inputEncoding:
+            return self.inputEncoding
+        
+        cpKeys=('dbcodepage','sbcodepage') if graphic else ('sbcodepage','dbcodepage')
+        for cpd in (self.tableDef,self.ixfHeader):
+            for cpk in cpKeys:
+                ixfCp=cpd.get(cpk,None)
+                if ixfCp and ixfCp!='00000':
+                    return self.getPythonCodePage(ixfCp)
+        
+        ixfCp='01208'
+        if self.traceRecords:
+            print("WARNING! No code page found the IXF records, using the default:",ixfCp,file=sys.stderr)
+        return self.getPythonCodePage(ixfCp)
         
     def getColumnEncoding(self,coldef):
         """
         The encoding for a column is checked first in the column definition
         then in the Table header then in the IXF header.
+        Character columns use the single byte code page, graphic columns
+        the double byte code page.
         The found value is then mapped to a python code-page.
         if you provide your own inputEncoding then it will override
         the IXF code page. This allows you to override the IXF code page
@@ -795,102 +2154,44 @@ class IXFParser:
         if self.inputEncoding:
             return self.inputEncoding
         
-        ixfCp=coldef.get('dbcodepage',None)
-        if ixfCp is None:
-            ixfCp=coldef.get('sbcodepage',None)
-        if ixfCp is None:
-            return self.getIXFFileEncoding()
-          
-        cpn=self.dbCodePageToPythonCodePageMap.get(ixfCp,None)
-        if cpn is None:
-            raise Exception("Unable to map db-codepage:"+ixfCp+" to a python codepage")
-        return cpn
-       
-    def getFieldActualLengthAndData(self,coldef,coltdef,pos,data):
+        graphic=coldef['type'] in self.graphicTypes
+        cpKeys=('dbcodepage','sbcodepage') if graphic else ('sbcodepage','dbcodepage')
+        for cpk in cpKeys:
+            ixfCp=coldef.get(cpk,None)
+            if ixfCp:
+                return self.getPythonCodePage(ixfCp)
+        return self.getIXFFileEncoding(graphic)
+    
+    def getCharWidth(self,coldef):
         """
-        DECIMAL -> 484 -> -2 use the method to get the length
-        precision P (as specified by the first three bytes of IXFCLENG in the column descriptor record) and 
-        scale S (as specified by the last two bytes of IXFCLENG). 
-        The length, in bytes, of a packed decimal number is (P+2)/2
-        
-        DECFLOAT:The storage length of the 16 digit value is 8 bytes, 
-          and the storage length of the 34 digit value is 16 bytes.
-        
-        TIMESTAMP ->
+        The lengths of the graphic types are counted in double byte
+        characters, return the byte width of a character for the column.
         """
-        tdlen=coltdef['length']
-        # fixed length known in type
-        if tdlen>0:
-            if coltdef['name'] in ('CHAR','DATE','TIME') and data[pos] == 0xff:
-                return (-1,None)
-            return (tdlen,data[pos:pos+tdlen])
-        
-        # fixed length defined in the column definition
-        if tdlen==-1:
-            if data[pos] == 0xff:
-                return (-1,None)
-            ln=coldef['data_len']
-            return (ln,data[pos:pos+ln])
-        
-        # lob var length defined in the column definition
-        if tdlen==-4:
-            blen=data[pos:pos+4]
-            if len(blen)==4:
-                ln=struct.unpack(self.endianism+'I',blen)[0]
-            else:
-                ln=struct.unpack(self.endianism+'H',blen)[0]
-            data=data[pos+4:pos+4+ln]
-            return (ln,data)
-        
-        # variable length length embedded in data (2 bytes)
-        if tdlen==0:
-            blen=data[pos:pos+2]
-            ln=struct.unpack(self.endianism+'H',blen)[0]
-            data=data[pos+2:pos+2+ln]
-            return (ln,data)
-        
-        # special cases
-        if coltdef['name'] =='FLOATING POINT':
-            ln=coldef['data_len']
-            return (ln,data[pos:pos+ln])
-        
-        if coltdef['name'] =='DECIMAL':
-            plen=coldef['data_len']>>16
-            return ((plen+2)/2,data[pos:pos+plen])
-        
-        if coltdef['name'] == 'DECFLOAT':
-            ln=(8 if coldef['data_len']==16 else 16)
-            return (ln,data[pos:pos+ln])
-        
-        if coltdef['name'] == 'TIMESTAMP':
-            if data[pos] == 0xff:
-                return (-1,None)
-            ln=20+coldef['data_len']
-            return (ln,data[pos:pos+ln])
-        
+        return 2 if coldef['type'] in self.graphicTypes else 1
+    
     def parseColumnsForField(self,cid,data):
         """
-        
+        Decode the columns stored in the 'D' record cid in the current row
+        using the decode plan built in beforeFirstRow.
         """
-        colset=self.getColset(cid)
+        colset=self.decodePlan.get(cid)
         if colset is None:return None
         
-        for cd in colset:
-            td=self.typeInfo[cd['type']]
-            pos=cd['pos']-1
-            len,cbdt = self.getFieldActualLengthAndData(cd,td,pos,data)
-            if len<0:return None
-            cv=td['parser'](cd,cbdt)
-            if self.traceRecords:
-                print("Parsing column:",cd['colno'],
+        row=self.currentRow
+        if self.traceRecords:
+            for colno,decode,cd in colset:
+                cv=decode(data)
+                print("Parsing column:",colno,
                       " name:",cd['name'],
-                      " data:",cbdt,
-                      " parser:",td['parser'],
+                      " type:",cd['type'],
                       " parsedValue:",cv,
-                      "\n prow:",self.currentRow,
+                      "\n prow:",row,
                       file=sys.stderr
                 )
-            self.currentRow[cd['colno']]=cv
+                row[colno]=cv
+            return
+        for colno,decode,cd in colset:
+            row[colno]=decode(data)
 
     def parseHeaderIXFRecord(self,rdtitms):
         """
@@ -1132,16 +2433,33 @@ class IXFParser:
         
         if colno==1:
             if not self.currentRow is None:
-                self.rowNum+=1
-                if self.rowNum < self.fromRow:
-                    if self.traceRecords:
-                        print(">>> Skipping beginning row!",file=sys.stderr)
-                else:
-                    self.onRowReceived()
-                    self.rowCount+=1
-            self.currentRow=[None]*self.columnCount
+                self.endCurrentRow()
+                if self.maxRows>0 and self.rowCount>=self.maxRows:
+                    self.currentRow=None
+                    return # the row after the last one (maxRows) is not decoded nor filtered
+            row=self.rowBuffer
+            row[:]=self.nullRow
+            self.currentRow=row
+            self.rowAccepted=None
+        elif self.rowAccepted is False:
+            return # rejected by the row filter, the rest of the row is not decoded
         
         self.parseColumnsForField(colno,rdtitms[2])
+        if colno==self.filterCid:
+            self.acceptCurrentRow()
+    
+    def endCurrentRow(self):
+        """
+        Called when all the 'D' records of the current row were parsed,
+        at the start of the next row or at the end of the file.
+        """
+        self.rowNum+=1
+        if self.rowNum < self.fromRow:
+            if self.traceRecords:
+                print(">>> Skipping beginning row!",file=sys.stderr)
+        else:
+            self.onRowReceived()
+            self.rowCount+=1
  
     IXFAppDB2RecDescriptors={
         "I":{
@@ -1259,12 +2577,8 @@ class IXFParser:
             if recDef:
                 recFields=recDef['fields']
                 nextRecLen=None
-                binbuff=rdtitms[1][1:]
-                for rd in recFields:
-                    recLen=rd[1]
-                    itm=binbuff[:recLen]
-                    binbuff=binbuff[recLen:]
-                    
+                recItems=recDef['layout'].split(rdtitms[1],1)
+                for rd,itm in zip(recFields,recItems):
                     if rd[4]:
                         if nextRecLen:
                             val=itm[:nextRecLen].decode(self.getIXFFileEncoding())
@@ -1296,32 +2610,322 @@ class IXFParser:
                 print(">>> Skip lob output for self.outObj type is:",type(self.outObj),file=sys.stderr)
             return
         
-        fn=self.getExternalLobIdentifier(cidx)
         if os.path.isdir(self.outObj):
             fd=self.outObj
         else:
             fd=os.path.dirname(self.outObj)    
+        return self.lobWriter(cidx,fd)
+    
+    def writeLobData(self,cidx,ld,out,data=None):
+        """
+        Write the lob value ld (LobLocator, str or bytes) of the column cidx
+        to the binary file out, return the number of bytes written.
+        A lob locator is streamed from the lob file to out, or written from
+        data when its data was prefetched.
+        """
+        textEncoding=self.getLobFileEncoding() if self.isTextLobType(cidx) else None
+        if type(ld) == LobLocator:
+            return ld.copyTo(out,textEncoding,errors=self.decodeErrors,data=data)
+        if type(ld) == str:
+            ld=ld.encode(textEncoding or 'utf_8')
+        out.write(ld)
+        return len(ld)
+    
+    def writeDetachedLob(self,cidx,fd):
+        """
+        The 'detached' lob strategy: each lob is written to its own file in
+        the folder fd, the file is named by getExternalLobIdentifier.
+        Return the file name.
+        """
+        fn=self.getExternalLobIdentifier(cidx)
         fp=os.path.join(fd,fn)
         
-        if self.isTextLobType(cidx):
-            ft='wt'
-        else:
-            ft='wb'
-        
         ld=self.currentRow[cidx]
         if type(ld) == LobLocator:
-            ld=ld.getLobData(self.traceRecords)
-        if ld and len(ld)>0:
-            with open(fp,ft) as out:
-                if self.traceRecords:print(">>> Writing lob:",fp,file=sys.stderr)
-                self.totalLobCount+=1
-                self.totalDataSize+=len(ld)
-                out.write(ld)
+            hasData=ld.objlen>0
+        else:
+            hasData=ld and len(ld)>0
+        if hasData:
+            if self.traceRecords:print(">>> Writing lob:",fp,repr(ld),file=sys.stderr)
+            self.totalLobCount+=1
+            if self.lobWorkers>0:
+                size=self.getLobOutputSize(cidx,ld)
+                if size is None:
+                    size=ld.objlen if type(ld) == LobLocator else len(ld)
+                self.submitLobJob(size,cidx,ld,None,fp,self.getPrefetchedLob(ld))
+                return fn
+            with open(fp,'wb') as out:
+                self.totalDataSize+=self.writeLobData(cidx,ld,out)
+        return fn
+    
+    def getLobOutputSize(self,cidx,ld):
+        """
+        Return the number of bytes writeLobData will write for the lob value
+        ld of the column cidx, None if unknown before writing (transcoded text).
+        """
+        if type(ld) == LobLocator:
+            textEncoding=self.getLobFileEncoding() if self.isTextLobType(cidx) else None
+            if not ld.encoding or not textEncoding or \
+               codecs.lookup(ld.encoding).name==codecs.lookup(textEncoding).name:
+                return ld.objlen
+            return None
+        if type(ld) == str:
+            return None
+        return len(ld)
+    
+    def writeLobJob(self,cidx,ld,out,fp=None,data=None):
+        """
+        A lob writer thread job: write the lob value ld of the column cidx to
+        out, or to the file fp opened (and closed) by the job.
+        The lob file pool of the parser is not shared with the threads, the
+        job reads the lob file with the pool of its thread (getThreadLobFiles)
+        or writes data, the lob data prefetched by the parser (getPrefetchedLob).
+        """
+        if type(ld) == LobLocator:
+            ld=LobLocator(ld.fp,ld.offset,ld.objlen,ld.lobFolder,ld.encoding,self.getThreadLobFiles())
+        if fp is not None:
+            with open(fp,'wb') as fout:
+                n=self.writeLobData(cidx,ld,fout,data)
+        else:
+            n=self.writeLobData(cidx,ld,out,data)
+        with self.lobCond:
+            self.totalDataSize+=n
+        return n
+    
+    def getPrefetchedLob(self,ld):
+        """
+        Return the prefetched data (see flushLobBatch) of the lob value ld,
+        None if ld is not a prefetched lob locator. The data stays valid after
+        dropPrefetched, it is handed to the lob writer jobs.
+        """
+        if type(ld) == LobLocator and ld.lobFiles is not None:
+            return ld.lobFiles.getPrefetched(ld.fp,ld.offset,ld.objlen,ld.lobFolder)
+        return None
+    
+    def getThreadLobFiles(self):
+        """
+        Return the LobFilePool of the current lob writer thread, the pools
+        are closed by joinLobJobs.
+        """
+        pool=getattr(self.lobThreadFiles,'pool',None)
+        if pool is None:
+            pool=LobFilePool(self.lobFiles.maxHandles,self.lobFiles.useMmap,self.lobFiles.maxGap,self.lobFiles.maxBlock)
+            self.lobThreadFiles.pool=pool
+            with self.lobCond:
+                self.lobThreadPools.append(pool)
+        return pool
+    
+    def submitLobJob(self,size,*jobArgs):
+        """
+        Hand writeLobJob(*jobArgs) to the lob writer threads, size is the
+        number of bytes of the job.
+        Wait while lobBytesInFlight bytes are already waiting to be written
+        (a single job larger than lobBytesInFlight is run alone).
+        """
+        if self.lobExecutor is None:
+            self.lobExecutor=concurrent.futures.ThreadPoolExecutor(self.lobWorkers,'lobWriter')
+        with self.lobCond:
+            while self.lobInFlight>0 and self.lobInFlight+size>self.lobBytesInFlight:
+                self.lobCond.wait()
+            self.lobInFlight+=size
+        job=self.lobExecutor.submit(self.writeLobJob,*jobArgs)
+        job.lobSize=size
+        job.add_done_callback(self.onLobJobDone)
+        self.lobJobs.append(job)
+        if len(self.lobJobs)>=1024:
+            self.checkLobJobs()
+    
+    def onLobJobDone(self,job):
+        with self.lobCond:
+            self.lobInFlight-=job.lobSize
+            self.lobCond.notify_all()
+    
+    def checkLobJobs(self,wait=False):
+        """
+        Forget the finished lob jobs (all the jobs when wait is set) and
+        print the errors of the failed ones.
+        """
+        pending=[]
+        for job in self.lobJobs:
+            if not wait and not job.done():
+                pending.append(job)
+                continue
+            x=job.exception()
+            if x is not None:
+                self.lobJobErrors+=1
+                print("Lob write failed:",file=sys.stderr)
+                traceback.print_exception(type(x),x,x.__traceback__,file=sys.stderr)
+        self.lobJobs=pending
+    
+    def joinLobJobs(self):
+        """
+        Wait for all the lob writer jobs, raise an exception if any failed.
+        """
+        self.checkLobJobs(True)
+        if self.lobExecutor is not None:
+            self.lobExecutor.shutdown()
+            self.lobExecutor=None
+        for pool in self.lobThreadPools:
+            pool.close()
+        self.lobThreadPools=[]
+        self.lobThreadFiles=threading.local()
+        if self.lobJobErrors>0:
+            errors=self.lobJobErrors
+            self.lobJobErrors=0
+            raise Exception(str(errors)+" lob writes failed")
+    
+    def getLobContainer(self,cidx,fd):
+        """
+        Return the packed lob container [file,file name,size,sequence] of the
+        column cidx (or of the table if lobPackScope is 'table'), a new container
+        file is started when the current one reaches lobPackSize bytes.
+        """
+        scope=None if self.lobPackScope=='table' else cidx
+        lc=self.lobContainers.get(scope)
+        if lc is not None and lc[2]<self.lobPackSize:
+            return lc
+        seq=0
+        if lc is not None:
+            if self.lobWorkers>0:
+                self.lobClosedContainers.append(lc[0])
+            else:
+                lc[0].close()
+            seq=lc[3]+1
+        name=self.tableDef['name']
+        if scope is not None:
+            name+="_"+self.columns[cidx]['name']
+        if self.outputPart is not None:
+            name+="_part%03d" % self.outputPart
+        cfn=name+".%03d.lob" % seq
+        lc=[open(os.path.join(fd,cfn),'wb'),cfn,0,seq]
+        self.lobContainers[scope]=lc
+        return lc
+    
+    def writePackedLob(self,cidx,fd):
+        """
+        The 'packed' lob strategy: the lobs are appended to container files
+        (one for each lob column or for the table, see getLobContainer).
+        Return the lob location specifier (container.offset.length/) of the lob,
+        the format DB2 LOAD uses for lobs in separate files.
+        """
+        ld=self.currentRow[cidx]
+        if ld is None:
+            return None
+        lc=self.getLobContainer(cidx,fd)
+        offset=lc[2]
+        self.totalLobCount+=1
+        if self.lobWorkers>0 and hasattr(os,'pwrite'):
+            # the range of the lob is reserved in the container and written by a lob job,
+            # a transcoded text lob (unknown length) is written now at the end of the container
+            objlen=self.getLobOutputSize(cidx,ld)
+            out=FileRangeWriter(lc[0],offset)
+            if objlen is not None:
+                lc[2]+=objlen
+                self.submitLobJob(objlen,cidx,ld,out,None,self.getPrefetchedLob(ld))
+            else:
+                objlen=self.writeLobData(cidx,ld,out)
+                lc[2]+=objlen
+                with self.lobCond:
+                    self.totalDataSize+=objlen
+        else:
+            objlen=self.writeLobData(cidx,ld,lc[0])
+            lc[2]+=objlen
+            self.totalDataSize+=objlen
+        if self.traceRecords:print(">>> Packed lob:",lc[1],offset,objlen,file=sys.stderr)
+        return LobLocator(lc[1],offset,objlen).toLLS()
+    
+    def writeReferenceLob(self,cidx,fd):
+        """
+        The 'reference' lob strategy: the lobs are left in their lob files,
+        a lob locator is output as the absolute location of the lob
+        (path.offset.length) and the lob file is never opened.
+        The lobs stored in the IXF file are written by the 'detached' strategy.
+        """
+        ld=self.currentRow[cidx]
+        if type(ld) != LobLocator:
+            return self.writeDetachedLob(cidx,fd)
+        key=(ld.lobFolder,ld.fp)
+        path=self.lobPaths.get(key)
+        if path is None:
+            path=self.lobPaths[key]=os.path.abspath(findLobFile(ld.fp,ld.lobFolder))
+        self.totalLobCount+=1
+        if self.traceRecords:print(">>> Lob reference:",path,ld.offset,ld.objlen,file=sys.stderr)
+        return path+'.'+str(ld.offset)+'.'+str(ld.objlen)
+    
+    def writeHashLob(self,cidx,fd):
+        """
+        The 'hash' lob strategy: the lob is hashed (lobHash, sha256 by default)
+        and written to a file named by its digest (and the extension of
+        getExternalLobIdentifier) only if that file does not exist yet.
+        The lobs up to lobHashBuffer bytes are hashed in memory (from the
+        prefetched or memory mapped lob file) and written only when the digest
+        is new, so a duplicate lob costs a hash. A larger lob is hashed while
+        it is written to a temporary file, removed when the lob is a duplicate.
+        Return the file name.
+        """
+        ld=self.currentRow[cidx]
+        if ld is None:
+            return None
+        lid=self.getExternalLobIdentifier(cidx)
+        ext=os.path.splitext(lid)[1]
+        self.totalLobCount+=1
+        size=self.getLobOutputSize(cidx,ld)
+        if type(ld) != LobLocator or (ld.objlen if size is None else size)<=self.lobHashBuffer:
+            data=self.getPrefetchedLob(ld) if size is not None else None
+            if data is None:
+                buf=io.BytesIO()
+                self.writeLobData(cidx,ld,buf)
+                data=buf.getbuffer()
+            fn=hashlib.new(self.lobHash,data).hexdigest()+ext
+            fp=os.path.join(fd,fn)
+            if self.isDuplicateLob(fn,fp,len(data)):
+                return fn
+            if self.traceRecords:print(">>> Writing lob:",fp,repr(ld),file=sys.stderr)
+            # written under a temporary name, other processes may write the same lob
+            tfp=os.path.join(fd,lid+".tmp%d" % os.getpid())
+            with open(tfp,'wb') as out:
+                out.write(data)
+            os.replace(tfp,fp)
+            self.totalDataSize+=len(data)
+            self.lobDigests.add(fn)
+            return fn
+        tfp=os.path.join(fd,lid+".tmp%d" % os.getpid())
+        with open(tfp,'wb') as out:
+            dw=LobDigestWriter(self.lobHash,out)
+            self.writeLobData(cidx,ld,dw)
+        fn=dw.hash.hexdigest()+ext
+        fp=os.path.join(fd,fn)
+        if self.isDuplicateLob(fn,fp,dw.size):
+            os.remove(tfp)
+            return fn
+        if self.traceRecords:print(">>> Writing lob:",fp,repr(ld),file=sys.stderr)
+        os.replace(tfp,fp)
+        self.totalDataSize+=dw.size
+        self.lobDigests.add(fn)
         return fn
     
+    def isDuplicateLob(self,fn,fp,size):
+        """
+        Return True if the lob file fn (path fp) of the hash strategy was
+        already written, the size bytes of the lob are then counted as saved.
+        """
+        if fn not in self.lobDigests and not os.path.exists(fp):
+            return False
+        self.lobDigests.add(fn)
+        self.lobBytesSaved+=size
+        if self.traceRecords:print(">>> Duplicate lob:",fp,file=sys.stderr)
+        return True
+    
+    def getLobFileEncoding(self):
+        """
+        The encoding of the text lob files, the outputEncoding if provided
+        otherwise the default encoding of the system.
+        """
+        return self.outputEncoding or locale.getpreferredencoding(False)
+    
     def parseIXFRecordFromStream(self,feed):
         """
-        Given an input stream (feed parameter) read and parse the next IXF record.
+        Given an input stream or record feed (feed parameter) read and parse the next IXF record.
         
        FIELD NAME     LENGTH    TYPE        COMMENTS
        ----------     -------   ---------   -------------
@@ -1330,20 +2934,25 @@ class IXFParser:
        
     Read the header and get the length and type of the record then
     parse the data based on the record type.
+    A plain stream is read with the IXFStreamFeed reader, use openRecordFeed
+    to get a buffered or memory mapped reader for the stream.
         """
-        ln=feed.read(6)
-        if not ln or len(ln)<6:
+        if not isinstance(feed,IXFRecordFeed):
+            feed=IXFStreamFeed(feed)
+        rec=feed.readRecord()
+        if rec is None:
+            if self.currentRow is not None:
+                # the last row ends with the file
+                self.endCurrentRow()
+                self.currentRow=None
             self.onLastRecord()
             return False
-        rt=feed.read(1)
-        if not rt:
-            self.onLastRecord()
-            return False
-        ln=self.parseInt(ln)
-        rt=rt.decode() # TODO: encoding?
-        rdt=feed.read(ln-1)
-        
-        rdtitms=[]
+        return self.parseIXFRecord(rec[0],rec[1])
+    
+    def parseIXFRecord(self,rt,rdt):
+        """
+        Parse the IXF record of type rt and body rdt (the data after the record type).
+        """
         self.ixfRecordCount+=1
         
         recd=self.recordTypes.get(rt) # retrieve the definition of the current record
@@ -1352,17 +2961,13 @@ class IXFParser:
             print("Unknown IXF record type:",rt,file=sys.stderr)
             return True
         
-        # parse the record based on its field lengths
-        rst=recd['fields']
-        off=0
-        for r in rst[:-1]:
-            rl=int(r[1])
-            rdtitms.append(rdt[off:off+rl])
-            off+=rl
-        rdtitms.append(rdt[off:])
+        # split the record based on its field lengths (the last field gets the rest of the record)
+        rdtitms=recd['layout'].split(rdt)
+        if not recd.get('zeroCopy',False):
+            rdtitms[-1]=bytes(rdtitms[-1])
         
         if self.traceRecords:
-            print(rt+":",repr(rdtitms),file=sys.stderr)
+            print(rt+":",repr([bytes(x) for x in rdtitms]),file=sys.stderr)
         
         # catch parsing record exceptions in order to continue with the next record
         # this make the logic more robust on files that have some errors at record level
@@ -1389,6 +2994,43 @@ class IXFParser:
        
     Read the header and get the length and type of the record then
     parse the data based on the record type.
+    The input stream is read using the reader selected by the readerMode
+    argument (see openRecordFeed).
+        """
+        rfeed=self.openFeed(feed,feedFolder)
+        try:
+            while self.parseIXFRecordFromStream(rfeed):
+                if self.maxRows>0:
+                    if self.rowCount>=self.maxRows:
+                        self.onLastRecord()
+                        break
+        finally:
+            if rfeed is not feed:
+                rfeed.close()
+    
+    def openFeed(self,feed,feedFolder=None):
+        """
+        Reset the parser state for the input stream feed and return its record
+        feed (see openRecordFeed) positioned on the first row to read (fromRow).
+        """
+        self.initFeedState(feedFolder)
+        
+        rfeed=openRecordFeed(feed,self.readerMode,self.readBufferSize,self.readAhead)
+        if self.traceRecords:
+            print("Using record reader:",type(rfeed).__name__,file=sys.stderr)
+        try:
+            if self.fromRow>1:
+                self.seekFromRow(rfeed)
+                self.skipRows(rfeed)
+        except:
+            if rfeed is not feed:
+                rfeed.close()
+            raise
+        return rfeed
+    
+    def initFeedState(self,feedFolder=None):
+        """
+        Reset the parser state before reading a new IXF input.
         """
         if feedFolder:
             if not self.lobFolder:
@@ -1406,30 +3048,214 @@ class IXFParser:
         self.unknownRecTypes=0
         self.aRecords=[]
         self.ixfHeader={}
+        self.tableDefProcessed=False
+    
+    def getRowIndex(self):
+        """
+        Return the row index of the ixfPath file (loaded from the sidecar file)
+        or None if the input is not a file or has no valid index.
+        """
+        if self.rowIndex is None and self.ixfPath and self.useIndex:
+            self.rowIndex=loadRowIndex(self.ixfPath,self.traceRecords)
+        return self.rowIndex
+    
+    def readTableDef(self,feed,dataStart):
+        """
+        Parse the header records ('H','T','C','A') found before the
+        first 'D' record at the offset dataStart.
+        """
+        while feed.tell()<dataStart:
+            rec=feed.readRecord()
+            if rec is None:
+                break
+            self.parseIXFRecord(rec[0],rec[1])
+    
+    def isSchemaOf(self,rowIndex):
+        """
+        Check the parsed column definitions against the schema of the row index.
+        """
+        icols=rowIndex.schema['tableDef']['columns']
+        if len(icols)!=len(self.columns):
+            return False
+        for ic,cd in zip(icols,self.columns):
+            for k in ('name','type','cid','pos'):
+                if ic.get(k)!=cd.get(k):
+                    return False
+        return True
+    
+    def seekFromRow(self,feed):
+        """
+        Use the row index (if there is one) to move the feed to the closest
+        indexed row before fromRow, the rows in between are still parsed and skipped.
+        """
+        rowIndex=self.getRowIndex()
+        if rowIndex is None or rowIndex.dataStart is None:
+            return
+        self.readTableDef(feed,rowIndex.dataStart)
+        if not self.isSchemaOf(rowIndex):
+            print("The row index does not match the table definition, ignored",file=sys.stderr)
+            return
+        rn,offset=rowIndex.findRow(self.fromRow)
+        if rn is None or rn<=1:
+            return
+        print("Using row index, start reading from row:",rn,file=sys.stderr)
+        feed.seek(offset)
+        self.rowNum=rn-1
+    
+    def scanRowIndex(self,feed):
+        """
+        Build the row index of the input reading only the record headers
+        of the 'D' records, the header records are parsed as usual.
+        """
+        rowIndex=IXFRowIndex(self.indexInterval)
+        if self.ixfPath:
+            rowIndex.setSource(self.ixfPath)
+        while True:
+            offset=feed.tell()
+            rec=feed.readRecord()
+            if rec is None:
+                break
+            rt,rdt=rec
+            if rt=='D':
+                if rdt[:3]==b'001': # the first 'D' record of a row
+                    rowIndex.addRow(offset)
+                continue
+            self.parseIXFRecord(rt,rdt)
+        self.tableDef['columns']=self.columns
+        rowIndex.schema={'ixfHeader':self.ixfHeader,'tableDef':self.tableDef}
+        return rowIndex
+    
+    def getStats(self):
+        """
+        Return the processing statistics as a dictionary.
+        """
+        return {
+            'table':self.tableDef.get('name',"unknown"),
+            'columnCount':self.columnCount,
+            'rowCount':self.rowCount,
+            'filteredRowCount':self.filteredRowCount,
+            'totalLobCount':self.totalLobCount,
+            'totalLobSize':self.totalLobSize,
+            'totalDataSize':self.totalDataSize,
+            'lobBytesSaved':self.lobBytesSaved,
+        }
+    
+    def skipRows(self,feed):
+        """
+        Skip the rows before fromRow, the 'D' records are counted using only
+        their record identifier (no column is decoded). The other records are
+        parsed as usual. The feed stops after the first 'D' record of the
+        row fromRow (that record is parsed).
+        """
+        while True:
+            rec=feed.readRecord()
+            if rec is None:
+                return
+            rt,rdt=rec
+            if rt!='D':
+                self.parseIXFRecord(rt,rdt)
+                continue
+            if not self.tableDefProcessed:
+                self.beforeFirstRow()
+                self.tableDefProcessed=True
+            if rdt[:3]!=b'001':
+                continue
+            if self.rowNum+1>=self.fromRow:
+                self.parseIXFRecord(rt,rdt)
+                return
+            self.rowNum+=1
+            if self.traceRecords:
+                print(">>> Skipping beginning row!",file=sys.stderr)
+    
+    def getRow(self,n):
+        """
+        Random access to the row n (1 based) of the ixfPath file using its
+        row index (see the index command). Return the list of column values
+        or None if the file has less than n rows.
+        """
+        rowIndex=self.getRowIndex()
+        if rowIndex is None:
+            raise Exception("No valid row index for:"+str(self.ixfPath))
+        if n<1 or n>rowIndex.rowCount:
+            return None
+        rn,offset=rowIndex.findRow(n)
         
-        while self.parseIXFRecordFromStream(feed):
-            if self.maxRows>0:
-                if self.rowCount>=self.maxRows:
-                    break
+        with openInputFile(self.ixfPath) as fin:
+            feed=openRecordFeed(fin,self.readerMode,self.readBufferSize,self.readAhead)
+            try:
+                if not self.tableDefProcessed:
+                    self.initFeedState(os.path.dirname(self.ixfPath))
+                    self.readTableDef(feed,rowIndex.dataStart)
+                    self.beforeFirstRow()
+                    self.tableDefProcessed=True
+                feed.seek(offset)
+                dlayout=self.recordTypes['D']['layout']
+                rowNum=rn-1
+                row=None
+                while True:
+                    rec=feed.readRecord()
+                    if rec is None:
+                        break
+                    if rec[0]!='D':
+                        continue
+                    rdtitms=dlayout.split(rec[1])
+                    colno=self.parseInt(rdtitms[0])
+                    if colno==1:
+                        if rowNum==n:
+                            break
+                        rowNum+=1
+                        if rowNum==n:
+                            row=[None]*self.columnCount
+                            self.currentRow=row
+                    if rowNum==n:
+                        self.parseColumnsForField(colno,rdtitms[2])
+                self.currentRow=None
+                return row
+            finally:
+                feed.close()
         
+# compile the record layouts once, all the records of a type are split by the same unpacker
+for recd in IXFParser.recordTypes.values():
+    recd['layout']=IXFRecordLayout([f[1] for f in recd['fields'][:-1]])
+for recd in IXFParser.IXFAppDB2RecDescriptors.values():
+    recFields=recd['fields']
+    if recFields[-1][1]<=0:
+        recFields=recFields[:-1] # the last field is the variable tail
+    recd['layout']=IXFRecordLayout([f[1] for f in recFields])
+del recd,recFields
+
 class IXFParserWriteCsv(IXFParser):
     """
-    An IXF parser that writes the row data in a .csv file
+    An IXF parser that writes the row data in a .csv file,
+    the binary values (see isBinaryColumn) are written as hex strings
     """
     
     def __init__(self,**args):
         IXFParser.__init__(self,**args)
         # todo, add csv, output parameters
         self.csvwriter=None
+        self.csvBatchRows=int(args.get('csvBatchRows',None) or 1000)
+        self.csvRows=[] # the rows not written yet
+        self.csvProject=None
+        self.csvHexColumns=[]
     
     def onTableDef(self):
         """
         Optional processing when the table definition is fully built.
         At this point a SQL statement can be created or the column list 
         written to a csv file 
+        The row projection on the output columns and the binary columns
+        (hex strings) are resolved here.
         """
         IXFParser.onTableDef(self)
-        if self.csvwriter:
+        colist=self.outputColumns if self.outputColumns else list(range(len(self.columns)))
+        if len(colist)==1:
+            cidx=colist[0]
+            self.csvProject=lambda row:[row[cidx]]
+        else:
+            self.csvProject=operator.itemgetter(*colist)
+        self.csvHexColumns=[i for i,cidx in enumerate(colist) if self.isBinaryColumn(self.columns[cidx])]
+        if self.csvwriter and self.outputHeader:
             colnames=[]
             coltypes=[]
             if self.outputColumns:
@@ -1458,31 +3284,50 @@ class IXFParserWriteCsv(IXFParser):
                 print(">>> Filtering out rownum:",self.rowNum,file=sys.stderr)
             return
         
-        for cidx in range(len(self.columns)):
-            if self.isLobType(cidx):
-                nlv=self.handleLobObject(cidx)
-                self.currentRow[cidx]=nlv
+        if not self.batchLobRow():
+            self.writeRow()
+    
+    def writeRow(self):
+        """
+        Add the current row to the rows written by flushCsvRows, the lobs are
+        written by handleLobObject
+        """
+        row=self.currentRow
+        for cidx in self.lobColumns:
+            row[cidx]=self.handleLobObject(cidx)
         
-        if self.outputColumns:
-            r=[]
-            for cidx in self.outputColumns:
-                r.append(self.currentRow[cidx])
-        else:
-            r=self.currentRow
-            
-        if self.csvwriter:          
-            self.csvwriter.writerow(    
-                [repr(x) if type(x) == bytes else x for x in r]
-            )
+        r=self.csvProject(row)
+        if self.csvHexColumns:
+            r=list(r)
+            for i in self.csvHexColumns:
+                if r[i] is not None:
+                    r[i]=r[i].hex()
+        self.csvRows.append(r)
+        if len(self.csvRows)>=self.csvBatchRows:
+            self.flushCsvRows()
+    
+    def flushCsvRows(self):
+        """
+        Write the batch of rows (csvBatchRows rows)
+        """
+        if self.csvwriter:
+            self.csvwriter.writerows(self.csvRows)
+        self.csvRows=[]
     
     def onLastRecord(self):
         """
-        Do the cleanup for a file conversion.
+        Do the cleanup for a file conversion, the output is flushed and closed
+        even when a lob write failed.
         """
-        if self.output:
-            self.output.flush()
-            if self.output!=sys.stdout:
-                self.output.close()
+        try:
+            self.flushLobBatch()
+            self.flushCsvRows()
+            IXFParser.onLastRecord(self)
+        finally:
+            if self.output:
+                self.output.flush()
+                if self.output not in (sys.stdout,getattr(sys.stdout,'buffer',None)):
+                    self.output.close()
 
     def setOutput(self,output):
         if self.output:
@@ -1490,111 +3335,329 @@ class IXFParserWriteCsv(IXFParser):
         self.output=output
         print("Output=",repr(self.output),file=sys.stderr)
         self.csvwriter=csv.writer(self.output)
+
+class IXFParserWriteCsvRaw(IXFParserWriteCsv):
+    """
+    An IXF parser that writes the row data in a .csv file opened in binary
+    mode (passthrough=y): the character columns (CHAR, VARCHAR, DATE, TIME,
+    TIMESTAMP) stored in the output encoding are copied from the 'D' records
+    to the output without being decoded and encoded again.
+    The other values are formatted like the csv writer does and encoded in
+    the output encoding. The cells holding a comma, a quote or a new line
+    are quoted (the csv minimal quoting).
+    """
+    binaryOutput=True
+    rawTypes=('452','448','456','384','388','392')
+    
+    def __init__(self,**args):
+        IXFParserWriteCsv.__init__(self,**args)
+        self.csvEncoding=codecs.lookup(self.outputEncoding or locale.getpreferredencoding(False)).name
+        # the delimiters must be the same bytes in the output encoding (ascii compatible)
+        self.csvRawCompatible=',"\r\n'.encode(self.csvEncoding,'replace')==b',"\r\n'
+        self.csvCellFormatters=[]
+    
+    def isRawColumn(self,coldef):
+        """
+        The columns read by the row filter are decoded, when the filter does
+        not declare its columns (filtercolumns) no column is raw.
+        """
+        if not self.csvRawCompatible or coldef['type'] not in self.rawTypes:
+            return False
+        if self.rowFilter:
+            if not self.filterColumns:
+                return False
+            fc=[str(c) for c in self.filterColumns]
+            if coldef['name'] in fc or str(coldef['colno']+1) in fc:
+                return False
+        return codecs.lookup(self.getColumnEncoding(coldef)).name==self.csvEncoding
+    
+    def getCellFormatters(self):
+        """
+        Return the functions formatting a value as the bytes of a csv cell:
+        (raw bytes, text, binary as hex)
+        """
+        quoted=re.compile(b'[,"\r\n]').search
+        encoding=self.csvEncoding
+        def rawCell(v):
+            if v is None:
+                return b''
+            if quoted(v):
+                return b'"'+v.replace(b'"',b'""')+b'"'
+            return v
+        def textCell(v):
+            if v is None:
+                return b''
+            if type(v) != str:
+                v=str(v)
+            return rawCell(v.encode(encoding))
+        def hexCell(v):
+            if v is None:
+                return b''
+            return v.hex().encode(encoding)
+        return rawCell,textCell,hexCell
+    
+    def onTableDef(self):
+        """
+        Resolve the cell formatter of each output column and write the header rows
+        """
+        IXFParserWriteCsv.onTableDef(self)
+        colist=self.outputColumns if self.outputColumns else list(range(len(self.columns)))
+        rawCell,textCell,hexCell=self.getCellFormatters()
+        self.csvCellFormatters=[]
+        for cidx in colist:
+            cd=self.columns[cidx]
+            if self.isBinaryColumn(cd):
+                self.csvCellFormatters.append(hexCell)
+            elif self.isRawColumn(cd):
+                self.csvCellFormatters.append(rawCell)
+            else:
+                self.csvCellFormatters.append(textCell)
+        if self.output and self.outputHeader:
+            self.csvRows.append(b','.join([textCell(self.columns[cidx]['name']) for cidx in colist]))
+            self.csvRows.append(b','.join([textCell(self.typeInfo[self.columns[cidx]['type']]['name']) for cidx in colist]))
+    
+    def writeRow(self):
+        """
+        Add the current row to the rows written by flushCsvRows, the lobs are
+        written by handleLobObject
+        """
+        row=self.currentRow
+        for cidx in self.lobColumns:
+            row[cidx]=self.handleLobObject(cidx)
+        r=self.csvProject(row)
+        line=b','.join([f(v) for f,v in zip(self.csvCellFormatters,r)])
+        if not line and len(r)==1:
+            line=b'""' # a single empty cell is quoted by the csv writer
+        self.csvRows.append(line)
+        if len(self.csvRows)>=self.csvBatchRows:
+            self.flushCsvRows()
+    
+    def flushCsvRows(self):
+        if self.csvRows and self.output:
+            self.output.write(b'\r\n'.join(self.csvRows))
+            self.output.write(b'\r\n')
+        self.csvRows=[]
+    
+    def setOutput(self,output):
+        if self.output:
+            self.output.close()
+        if isinstance(output,io.TextIOBase):
+            output.flush()
+            output=output.buffer
+        self.output=output
+        print("Output=",repr(self.output),file=sys.stderr)
         
 class IXFParserWriteJSON(IXFParser):
     """
-    An IXF parser that writes the row data in a .JSON file
+    An IXF parser that writes the row data in a .JSON file, the table is a
+    list of row objects (column name: value).
+    The rows are encoded once with the same json encoder and written by
+    batches of jsonBatchRows rows.
     """
+    # the text written before the first row, between the rows and at the end
+    jsonHeader="[\n"
+    jsonRowSeparator=",\n"
+    jsonFooter="\n]\n"
     
     def __init__(self,**args):
         IXFParser.__init__(self,**args)
+        self.jsonBatchRows=int(args.get('jsonBatchRows',None) or 1000)
+        self.jsonRows=[] # the encoded rows not written yet
+        self.jsonRowsWritten=0
+        self.jsonKeys=None
+        self.jsonColumns=None
+        self.jsonEncode=json.JSONEncoder(check_circular=False,default=self.jsonValue).encode
+    
+    def jsonValue(self,v):
+        """
+        Return the json value of the python objects the json encoder does not know:
+        decimals as strings (no precision loss) and bytes as hex strings.
+        """
+        if type(v) == bytes:
+            return v.hex()
+        return str(v)
     
     def onTableDef(self):
         """
-        A json table is a list of records so we write a list start line
+        Compute the keys of the row objects and write the list start
         """
         IXFParser.onTableDef(self)
-        print("[",file=self.output)
+        if self.outputColumns:
+            self.jsonColumns=list(self.outputColumns)
+        else:
+            self.jsonColumns=list(range(len(self.columns)))
+        self.jsonKeys=[self.columns[cidx]['name'] for cidx in self.jsonColumns]
+        if self.output and self.outputHeader:
+            self.output.write(self.jsonHeader)
         
     def onRowReceived(self):
         """
         Process a data row if an output was defined
         """
-        if self.fromRow>0:
-            if self.rowNum<self.fromRow:
-                return # skip rows output if required
-        
-        for cidx in range(len(self.columns)):
-            if self.isLobType(cidx):
-                nlv=self.handleLobObject(cidx)
-                self.currentRow[cidx]=nlv
-                
-        rowMap={}
-        for i in range(len(self.currentRow)):
-            rowMap[self.columns[i],self.currentRow[i]]
+        if not self.acceptCurrentRow():
+            return
+        if not self.batchLobRow():
+            self.writeRow()
+    
+    def writeRow(self):
+        """
+        Encode the current row, the lobs are written by handleLobObject
+        """
+        row=self.currentRow
+        for cidx in self.lobColumns:
+            row[cidx]=self.handleLobObject(cidx)
         
-        json.dump(rowMap, self.output,indent="  ",sort_keys=True)
+        self.jsonRows.append(self.jsonEncode(dict(zip(self.jsonKeys,[row[cidx] for cidx in self.jsonColumns]))))
+        if len(self.jsonRows)>=self.jsonBatchRows:
+            self.flushJsonRows()
+    
+    def flushJsonRows(self):
+        """
+        Write the encoded rows, the first row of the output (after the header)
+        has no separator, a part of a parallel conversion (no header) starts
+        with a separator.
+        """
+        if not self.jsonRows:
+            return
+        if self.output:
+            if self.jsonRowsWritten>0 or not self.outputHeader:
+                self.output.write(self.jsonRowSeparator)
+            self.output.write(self.jsonRowSeparator.join(self.jsonRows))
+        self.jsonRowsWritten+=len(self.jsonRows)
+        self.jsonRows=[]
         
     def onLastRecord(self):
         """
-        Do the cleanup for a file conversion.
+        Do the cleanup for a file conversion, the output is flushed and closed
+        even when a lob write failed.
         """
-        if self.output:
-            print("]",file=self.output)
-            self.output.flush()
-            if self.output!=sys.stdout:
-                self.output.close()
+        try:
+            self.flushLobBatch()
+            self.flushJsonRows()
+            IXFParser.onLastRecord(self)
+        finally:
+            if self.output:
+                if self.outputFooter:
+                    self.output.write(self.jsonFooter)
+                self.output.flush()
+                if self.output!=sys.stdout:
+                    self.output.close()
 
     def setOutput(self,output):
         if self.output:
             self.output.close()
         self.output=output
 
-    def handleLobObject(self,cidx):
+class IXFParserWriteJSONL(IXFParserWriteJSON):
+    """
+    An IXF parser that writes the row data in a JSON Lines (.jsonl) file,
+    one row object by line, the file can be split and streamed by lines.
+    """
+    jsonHeader=""
+    jsonRowSeparator="\n"
+    jsonFooter=""
+    
+    def flushJsonRows(self):
         """
-        TODO: replace if you need a different approach!
-        
-        Default implementation will save each lob in a file in the given path.
-        Override this method to implement your own lob processing! 
-        Return a piece of identity to be placed in the csv record (for example).
+        Write the encoded rows, each row ends with a new line.
         """
-        if self.output is None:return
-        
-        fn=self.getExternalLobIdentifier(cidx)
-        if type(self.outObj) == str:
-            if os.path.isdir(self.outObj):
-                fd=self.outObj
-            else:
-                fd=os.path.dirname(self.outObj)    
-            fp=os.path.join(fd,fn)
-            
-            if self.isTextLobType(cidx):
-                ft='wt'
-            else:
-                ft='wb'
-            
-            if self.traceRecords:
-                print("Writing lob:",fp,file=sys.stderr)
-            
-            with open(fp,ft) as out:
-                ld=self.currentRow[cidx]
-                if type(ld) == LobLocator:
-                    ld=ld.getLobData(self.traceRecords)
-                out.write(ld)
-            return fn
-        
-        raise Exception("JSON in document inlining is not yet supported!")
-        
+        if not self.jsonRows:
+            return
+        if self.output:
+            self.output.write("\n".join(self.jsonRows))
+            self.output.write("\n")
+        self.jsonRowsWritten+=len(self.jsonRows)
+        self.jsonRows=[]
+
 class IXFParserGetFileInfo(IXFParser):
     """
     An IXF parser that extracts statistics from an .ixf file
     and write's them down to a file or stdout using a format
     like text, csv, json, xml (only text and json is supported now)
+    
+    Only the header records (H, T, C and A) are parsed, the rows are counted
+    using the record identifier of the 'D' records (not decoded). With estimate=y
+    the row count is extrapolated from the size of the first estimateRows rows
+    and the file size. The rows are decoded (lob statistics) with decodeRows=y
+    and when a row filter, fromRow or maxRows is used.
     """
     
     def __init__(self,**args):
         IXFParser.__init__(self,**args)
+        self.decodeRows=(args.get('decodeRows','n') in ('y',True)
+            or bool(self.rowFilter) or self.fromRow>1 or self.maxRows>0)
+        self.estimate=args.get('estimate','n') in ('y',True)
+        self.estimateRows=int(args.get('estimateRows',None) or 1000)
+        self.rowCountEstimated=False
     
-    def onTableDef(self):
+    def processIFXRecords(self,feed,feedFolder=None):
+        if self.decodeRows:
+            return IXFParser.processIFXRecords(self,feed,feedFolder)
+        self.initFeedState(feedFolder)
+        rfeed=openRecordFeed(feed,self.readerMode,self.readBufferSize,self.readAhead)
+        if self.traceRecords:
+            print("Using record reader:",type(rfeed).__name__,file=sys.stderr)
+        try:
+            self.countRows(rfeed)
+        finally:
+            if rfeed is not feed:
+                rfeed.close()
+        self.onLastRecord()
+    
+    def getInputSize(self):
         """
+        Return the size of the input file, None for stdin and compressed files.
         """
-        IXFParser.onTableDef(self)
-        if self.output:
-            json.dump(self.tableDef, self.output)
-     
-    def onRowReceived(self):
+        if not self.ixfPath or splitCompressedSuffix(self.ixfPath)[1]:
+            return None
+        try:
+            return os.path.getsize(self.ixfPath)
+        except OSError:
+            return None
+    
+    def countRows(self,feed):
+        """
+        Count the rows reading only the record headers of the 'D' records,
+        the other records are parsed as usual. With estimate the count stops
+        after estimateRows rows and the row count is extrapolated.
+        """
+        size=self.getInputSize() if self.estimate else None
+        dataStart=None
+        rowCount=0
+        while True:
+            offset=feed.tell()
+            rec=feed.readRecord()
+            if rec is None:
+                break
+            rt,rdt=rec
+            if rt=='D':
+                if rdt[:3]==b'001': # the first 'D' record of a row
+                    if dataStart is None:
+                        dataStart=offset
+                        self.beforeFirstRow()
+                        self.tableDefProcessed=True
+                    elif size and rowCount>=self.estimateRows:
+                        rowCount=round(rowCount*(size-dataStart)/(offset-dataStart))
+                        self.rowCountEstimated=True
+                        break
+                    rowCount+=1
+                continue
+            self.parseIXFRecord(rt,rdt)
+        if not self.tableDefProcessed and self.columns:
+            self.beforeFirstRow()
+            self.tableDefProcessed=True
+        self.rowCount=self.rowNum=rowCount
+    
+    def getStats(self):
+        stats=IXFParser.getStats(self)
+        stats['rowsDecoded']=self.decodeRows
+        stats['rowCountEstimated']=self.rowCountEstimated
+        return stats
+    
+    def onTableDef(self):
         """
         """
+        IXFParser.onTableDef(self)
         if self.output:
             json.dump(self.tableDef, self.output)
         
@@ -1602,14 +3665,237 @@ class IXFParserGetFileInfo(IXFParser):
         """
         Output the stats info to the output file and format 
         """
-        if self.output:
-            self.output.close()        
+        try:
+            IXFParser.onLastRecord(self)
+        finally:
+            if self.output:
+                self.output.close()        
         
     def setOutput(self,output):
         if self.output:
             self.output.close()
         self.output=output
         
+class IXFParserWriteIndex(IXFParser):
+    """
+    An IXF parser that writes the row index sidecar file (.ixfidx) of an .ixf file.
+    Only the record headers of the 'D' records are read, the rows are not decoded.
+    """
+    
+    def __init__(self,**args):
+        IXFParser.__init__(self,**args)
+        self.useIndex=False
+    
+    def processIFXRecords(self,feed,feedFolder=None):
+        if not self.ixfPath:
+            raise Exception("The index command needs an input file")
+        self.initFeedState(feedFolder)
+        rfeed=openRecordFeed(feed,self.readerMode,self.readBufferSize,self.readAhead)
+        try:
+            rowIndex=self.scanRowIndex(rfeed)
+        finally:
+            if rfeed is not feed:
+                rfeed.close()
+        self.rowIndex=rowIndex
+        self.rowCount=rowIndex.rowCount
+        idxPath=self.ixfPath+IXFRowIndex.suffix
+        rowIndex.write(idxPath)
+        print("Row index written to:",idxPath," entries:",len(rowIndex.rows),file=sys.stderr)
+        self.onLastRecord()
+    
+    def setOutput(self,output):
+        self.output=output
+        
+class IXFParserRows(IXFParser):
+    """
+    An IXF parser that keeps the accepted rows (tuples of the output columns)
+    in the rows list, used by IXFReader.
+    """
+    
+    def __init__(self,**args):
+        IXFParser.__init__(self,**args)
+        self.rows=[]
+    
+    def onRowReceived(self):
+        if not self.acceptCurrentRow():
+            return
+        if self.outputColumns:
+            self.rows.append(tuple([self.currentRow[cidx] for cidx in self.outputColumns]))
+        else:
+            self.rows.append(tuple(self.currentRow))
+
+class IXFReader:
+    """
+    Read the rows of an IXF file lazily, without subclassing IXFParser:
+    
+        with IXFReader('table.ixf',columns=['ID','NAME'],batchSize=1000) as reader:
+            print(reader.header)
+            for batch in reader:
+                cursor.executemany(sql,batch)
+    
+    source is an IXF file path or a binary stream, columns the output columns
+    (names or 1 based indexes, all the columns by default).
+    The rows are tuples of the column values, the lob locators are LobLocator
+    objects (getLobData reads the lob). With batchSize>0 the reader yields
+    lists of at most batchSize rows instead of single rows.
+    The other arguments are the IXFParser arguments (fromRow, maxRows, filter,
+    lobFolder, readerMode, ...), the lob folder of a file is its folder by default.
+    The table definition is read when the reader is created: schema is the
+    list of the output column definitions and header the list of their names.
+    """
+    
+    def __init__(self,source,columns=None,batchSize=0,**args):
+        if columns and type(columns) != str:
+            columns=','.join([str(x) for x in columns])
+        if columns:
+            args['columns']=columns
+        if type(source) == str:
+            args.setdefault('ixfPath',source)
+            args.setdefault('lobFolder',os.path.dirname(os.path.abspath(source)))
+        self.batchSize=int(batchSize or 0)
+        self.parser=IXFParserRows(**args)
+        self.input=None
+        if type(source) == str:
+            self.input=source=openInputFile(source)
+            feedFolder=os.path.dirname(os.path.abspath(args['ixfPath']))
+        else:
+            feedFolder=None
+        self.source=source
+        self.feed=None
+        self.done=False
+        try:
+            self.feed=self.parser.openFeed(source,feedFolder)
+            while not self.parser.tableDefProcessed and self.readRecord():
+                pass
+        except:
+            self.close()
+            raise
+    
+    @property
+    def tableDef(self):
+        return self.parser.tableDef
+    
+    @property
+    def schema(self):
+        cols=self.parser.columns
+        if self.parser.outputColumns:
+            return [cols[cidx] for cidx in self.parser.outputColumns]
+        return list(cols)
+    
+    @property
+    def header(self):
+        return [cd['name'] for cd in self.schema]
+    
+    def readRecord(self):
+        """
+        Parse the next IXF record, return False at the end of the input (or
+        when maxRows rows were read).
+        """
+        if self.done:
+            return False
+        p=self.parser
+        if not p.parseIXFRecordFromStream(self.feed):
+            self.done=True
+        elif p.maxRows>0 and p.rowCount>=p.maxRows:
+            p.onLastRecord()
+            self.done=True
+        return not self.done
+    
+    def __iter__(self):
+        rows=self.parser.rows
+        while True:
+            if self.batchSize>0:
+                if len(rows)>=self.batchSize or (self.done and rows):
+                    yield rows[:self.batchSize]
+                    del rows[:self.batchSize]
+                    continue
+            elif rows:
+                # the rows of the records read are yielded before reading the next one
+                self.parser.rows=[]
+                yield from rows
+                rows=self.parser.rows
+                continue
+            if not self.readRecord() and not rows:
+                return
+    
+    def getStats(self):
+        return self.parser.getStats()
+    
+    def close(self):
+        """
+        Close the input file (if opened by the reader) and the lob files.
+        """
+        if not self.done:
+            self.done=True
+            self.parser.onLastRecord()
+        if self.feed is not None and self.feed is not self.source:
+            self.feed.close()
+        self.feed=None
+        if self.input is not None:
+            self.input.close()
+            self.input=None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self,excType,excValue,tb):
+        self.close()
+        return False
+
+# the parser class writing each output format (outfmt), the output file extension is the format name
+outputWriters={
+    'csv':IXFParserWriteCsv,
+    'json':IXFParserWriteJSON,
+    'jsonl':IXFParserWriteJSONL,
+}
+
+def getOutputWriter(args):
+    """
+    Return the parser class writing the output format (outfmt) of the conversion.
+    """
+    fmt=args.get('outfmt','csv')
+    if fmt not in outputWriters:
+        raise Exception("Invalid output format:"+fmt)
+    if fmt == 'csv' and args.get('passthrough','n') in ('y',True):
+        return IXFParserWriteCsvRaw
+    return outputWriters[fmt]
+
+def getOutputFileName(inp,args):
+    """
+    Return the output file name of the inp file: the input file name without
+    its .ixf and compression suffixes, with the outfmt and outcompress suffixes.
+    """
+    ofn=os.path.splitext(splitCompressedSuffix(os.path.basename(inp))[0])[0]+'.'+args.get('outfmt','csv')
+    if args.get('outcompress',None):
+        ofn+='.'+args['outcompress']
+    return ofn
+
+def openOutputStream(outp,args):
+    """
+    Open a binary output file, compressed in a separate thread (see CompressedFileWriter)
+    with the outcompress format (gz, bz2 or xz) when provided.
+    """
+    bufferSize=int(args.get('outputBufferSize',None) or 1024*1024)
+    compress=args.get('outcompress',None)
+    if compress:
+        if '.'+compress not in compressedOpeners:
+            raise Exception("Invalid output compression:"+compress)
+        return io.BufferedWriter(CompressedFileWriter(outp,compressedOpeners['.'+compress]),bufferSize)
+    return open(outp,"wb",buffering=bufferSize)
+
+def openOutputFile(outp,writerClass,args):
+    """
+    Open the output file of a writer class: binary for the writers writing
+    bytes, text in the outputEncoding (the system encoding by default) otherwise.
+    """
+    if getattr(writerClass,'binaryOutput',False):
+        return openOutputStream(outp,args)
+    encoding=args.get('outputEncoding',None) or None
+    if args.get('outcompress',None):
+        return io.TextIOWrapper(openOutputStream(outp,args),encoding=encoding)
+    bufferSize=int(args.get('outputBufferSize',None) or 1024*1024)
+    return open(outp,"wt",buffering=bufferSize,encoding=encoding)
+
 def processSingleFile(cmd,inp,outp,**args):
     """
     Process a single ixf file given an IXF instance processor
@@ -1620,30 +3906,37 @@ def processSingleFile(cmd,inp,outp,**args):
         if type(outp) == str:
             outp=os.path.abspath(outp)
             if not os.path.exists(outp):
-                if outp.endswith(".csv") or outp.endswith(".json"):
+                if os.path.splitext(splitCompressedSuffix(outp)[0])[1] in ['.'+fmt for fmt in outputWriters]:
                     os.makedirs(os.path.dirname(outp), exist_ok=True)
                 else:
                     os.makedirs(outp, exist_ok=True)
             if os.path.isdir(outp):
-                ofn=os.path.splitext(os.path.basename(inp))[0]+('.csv' if args['outfmt']=='csv' else '.json')
-                outp=os.path.join(outp,ofn)
+                outp=os.path.join(outp,getOutputFileName(inp,args))
+            elif args.get('outcompress',None) and not outp.endswith('.'+args['outcompress']):
+                outp+='.'+args['outcompress']
             
             print("Writing to file:",outp,file=sys.stderr)
-            out=open(outp,"wt")
+            workers=int(args.get('workers',None) or 1)
+            if workers>1 and type(inp) == str:
+                if not splitCompressedSuffix(inp)[1]:
+                    return processFileParallel(inp,outp,workerCount=workers,**args)
+                print("The workers need an uncompressed input, converting with a single process",file=sys.stderr)
+            out=openOutputFile(outp,getOutputWriter(args),args)
         else:
             print("Writing to stdout",file=sys.stderr)
             
-        fmt=args.get('outfmt','csv')
-        if fmt == 'csv':
-            ixfp=IXFParserWriteCsv(**args)
-        elif fmt == 'json':
-            ixfp=IXFParserWriteJSON(**args)
-        else:
-            raise Exception("Invalid output format:"+args['outfmt'])
+        ixfp=getOutputWriter(args)(**args)
+    elif cmd == 'index':
+        if type(inp) != str:
+            print("The index command needs an input file, not stdin!",file=sys.stderr)
+            return None
+        ixfp=IXFParserWriteIndex(**args)
     else:
         ixfp=IXFParserGetFileInfo(**args)
         
     ixfp.setOutput(out)
+    if type(inp) == str:
+        ixfp.ixfPath=inp
     
     print("Start processing input from:",inp,"\n using parser:",ixfp,file=sys.stderr)
     if out:
@@ -1651,7 +3944,7 @@ def processSingleFile(cmd,inp,outp,**args):
     
     start=time.time()
     if type(inp) == str: 
-        with open(inp,"rb") as fin:
+        with openInputFile(inp) as fin:
             print("Reading from:",inp,file=sys.stderr)
             ixfp.processIFXRecords(fin,os.path.dirname(inp))
     else:
@@ -1668,33 +3961,227 @@ def processSingleFile(cmd,inp,outp,**args):
         print("TableDescriptor:",file=sys.stderr)
         pprint.pprint(ixfp.tableDef, sys.stderr)
     
-    print("Table   Name:",ixfp.tableDef.get('name',"unknown"),file=sys.stderr)
-    print("Column count:",ixfp.columnCount,file=sys.stderr)
-    print("Lobs    size:",ixfp.totalLobSize,file=sys.stderr)           
-    print("Lob    count:",ixfp.totalLobCount,file=sys.stderr)
-    print("Row    count:",ixfp.rowCount,file=sys.stderr)
-    print("Row filtered:",ixfp.filteredRowCount,file=sys.stderr)
+    stats=ixfp.getStats()
+    stats['file']=inp if type(inp) == str else 'stdin'
+    stats['seconds']=stop-start
+    printStats(stats)
+    return stats
+
+def printStats(stats):
+    """
+    Print the statistics of a file processing (see processSingleFile).
+    """
+    print("Table   Name:",stats['table'],file=sys.stderr)
+    print("Column count:",stats['columnCount'],file=sys.stderr)
+    if stats.get('rowsDecoded',True):
+        print("Lobs    size:",stats['totalLobSize'],file=sys.stderr)           
+        print("Lob    count:",stats['totalLobCount'],file=sys.stderr)
+    else:
+        print("Lobs    size: not counted, the rows are not decoded (decodeRows=y)",file=sys.stderr)
+    if stats.get('rowCountEstimated'):
+        print("Row    count:",stats['rowCount'],"(estimated)",file=sys.stderr)
+    else:
+        print("Row    count:",stats['rowCount'],file=sys.stderr)
+    print("Row filtered:",stats['filteredRowCount'],file=sys.stderr)
+    if stats.get('lobBytesSaved'):
+        print("Lobs   saved:",stats['lobBytesSaved'],"bytes (duplicate lobs not written)",file=sys.stderr)
     
-    print("Processing time(sec):",stop-start,file=sys.stderr)
+    print("Processing time(sec):",stats['seconds'],file=sys.stderr)
    
 
+def splitRowRanges(rowIndex,fromRow,maxRows,parts):
+    """
+    Split the rows to convert in at most parts ranges (first row,row count),
+    the ranges start on indexed rows so the workers can seek to their first row.
+    """
+    first=max(1,fromRow)
+    last=rowIndex.rowCount
+    if maxRows>0:
+        last=min(last,first+maxRows-1)
+    if last<first:
+        return []
+    cuts=[first]
+    for i in range(1,parts):
+        rn,offset=rowIndex.findRow(first+(last-first+1)*i//parts)
+        if rn is not None and rn>cuts[-1]:
+            cuts.append(rn)
+    cuts.append(last+1)
+    return [(cuts[i],cuts[i+1]-cuts[i]) for i in range(len(cuts)-1)]
+
+def convertFilePart(inp,partPath,partNo,rowIndex,partFromRow,partRows,outputHeader,outputFooter,args):
+    """
+    Parallel conversion worker, convert partRows rows starting with the row partFromRow
+    of the inp file to the file partPath. Return the parser statistics.
+    """
+    args=dict(args)
+    args['fromRow']=partFromRow
+    args['maxRows']=partRows
+    args['outputHeader']=outputHeader
+    args['outputFooter']=outputFooter
+    args['outputPart']=partNo
+    args['outcompress']=None # the parts are concatenated (and compressed) by processFileParallel
+    writerClass=getOutputWriter(args)
+    ixfp=writerClass(**args)
+    ixfp.ixfPath=inp
+    ixfp.rowIndex=rowIndex
+    ixfp.setOutput(openOutputFile(partPath,writerClass,args))
+    with open(inp,"rb") as fin:
+        ixfp.processIFXRecords(fin,os.path.dirname(inp))
+    return ixfp.getStats()
+
+def processFileParallel(inp,outp,workerCount,**args):
+    """
+    Convert the inp file to outp using workerCount processes, each worker converts
+    a range of rows (aligned on the row index entries) to a part file and the
+    parts are concatenated in the row order.
+    The row index is read from the .ixfidx file or built by scanning the record headers.
+    """
+    start=time.time()
+    ixfp=IXFParser(**args)
+    ixfp.ixfPath=inp
+    rowIndex=ixfp.getRowIndex()
+    if rowIndex is None:
+        print("Scanning the row offsets of:",inp,file=sys.stderr)
+        with open(inp,"rb") as fin:
+            feed=openRecordFeed(fin,ixfp.readerMode,ixfp.readBufferSize,ixfp.readAhead)
+            try:
+                ixfp.initFeedState(os.path.dirname(inp))
+                rowIndex=ixfp.scanRowIndex(feed)
+            finally:
+                feed.close()
+    
+    ranges=splitRowRanges(rowIndex,ixfp.fromRow,ixfp.maxRows,workerCount)
+    if not ranges:
+        ranges=[(max(1,ixfp.fromRow),0)]
+    print("Converting with",len(ranges),"workers, row ranges:",ranges,file=sys.stderr)
+    
+    partPaths=[outp+'.part%03d' % i for i in range(len(ranges))]
+    stats=[]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        futures=[
+            pool.submit(convertFilePart,inp,partPaths[i],i,rowIndex,rn,rc,i==0,i==len(ranges)-1,args)
+            for i,(rn,rc) in enumerate(ranges)
+        ]
+        for f in futures:
+            stats.append(f.result())
+    
+    # a json part (no list start) starts with a row separator, dropped when no row was written before it
+    separator=b''
+    if args.get('outfmt','csv') == 'json':
+        separator=IXFParserWriteJSON.jsonRowSeparator.encode()
+    rowsWritten=0
+    with openOutputStream(outp,args) as out:
+        for pp,st in zip(partPaths,stats):
+            with open(pp,"rb") as part:
+                if separator and rowsWritten==0 and pp!=partPaths[0]:
+                    if part.read(len(separator))!=separator:
+                        part.seek(0)
+                shutil.copyfileobj(part,out,1024*1024)
+            os.remove(pp)
+            rowsWritten+=st['rowCount']-st['filteredRowCount']
+    stop=time.time()
+    
+    total=dict(stats[0])
+    for k in ('rowCount','filteredRowCount','totalLobCount','totalLobSize','totalDataSize','lobBytesSaved'):
+        total[k]=sum(st[k] for st in stats)
+    total['file']=inp
+    total['seconds']=stop-start
+    printStats(total)
+    return total
+
+def processBatchFile(cmd,inp,outp,logPath,args):
+    """
+    Batch process worker, process a single file writing the stderr messages
+    in the logPath file. Return the file statistics.
+    """
+    stderr=sys.stderr
+    with open(logPath,"wt") as log:
+        sys.stderr=log
+        try:
+            return processSingleFile(cmd,inp,outp,**args)
+        finally:
+            sys.stderr=stderr
+
+def printBatchSummary(allStats,seconds=None):
+    """
+    Print the statistics of the processed files and their totals,
+    seconds is the elapsed time of the batch (the sum of the file times by default).
+    The lobs are shown as '-' for the files whose rows were not decoded (info without decodeRows).
+    """
+    fmt="%-40s %12s %8s %14s %14s %10s"
+    print(fmt % ("File","Rows","Lobs","Lob bytes","Data bytes","Seconds"),file=sys.stderr)
+    total={'rowCount':0,'totalLobCount':0,'totalLobSize':0,'totalDataSize':0,'lobBytesSaved':0,'seconds':0}
+    lobsCounted=False
+    for st in allStats:
+        if 'error' in st:
+            print("%-40s ERROR: %s" % (os.path.basename(st['file']),st['error']),file=sys.stderr)
+            continue
+        decoded=st.get('rowsDecoded',True)
+        lobsCounted=lobsCounted or decoded
+        print(fmt % (
+            os.path.basename(st['file']),st['rowCount'],st['totalLobCount'] if decoded else '-',
+            st['totalLobSize'] if decoded else '-',st['totalDataSize'],"%.3f" % st['seconds']
+        ),file=sys.stderr)
+        for k in total:
+            total[k]+=st[k]
+    print(fmt % (
+        "Total (%d files)" % len(allStats),total['rowCount'],total['totalLobCount'] if lobsCounted else '-',
+        total['totalLobSize'] if lobsCounted else '-',total['totalDataSize'],
+        "%.3f" % (total['seconds'] if seconds is None else seconds)
+    ),file=sys.stderr)
+    if total['lobBytesSaved']:
+        print("Duplicate lob bytes not written:",total['lobBytesSaved'],file=sys.stderr)
+
 def batchProcess(cmd,inp,outp=None,**args):
     """
     Process a set of files as a batch.
     List file information/stats or convert to .csv.
+    With jobs=N the files are processed by N processes, the largest files
+    first, the stderr messages of each file are written to a .log file
+    (the .ixf file name + '.log') in the output folder (the input folder for info).
     """
     if (cmd == 'convert') and ((outp is None) or (type(outp)!=str) or not os.path.isdir(outp)):
         raise Exception("Output path is not a folder!")
     
     print("Start processing folder:",inp,file=sys.stderr)
-    pfc=0
+    files=[]
     for fn in os.listdir(inp):
-        if fn.endswith('.ixf'):
+        if splitCompressedSuffix(fn)[0].endswith('.ixf'):
             infp=os.path.join(inp,fn)
-            outfp=os.path.join(outp,fn[:-3]+'csv') if cmd=='convert' else None
-            processSingleFile(cmd,infp,outfp,**args)
-            pfc+=1
+            files.append((os.path.getsize(infp),fn,infp))
+    files.sort(reverse=True) # largest first
+    
+    jobs=int(args.get('jobs',None) or 1)
+    allStats=[]
+    start=time.time()
+    if jobs>1 and len(files)>1:
+        logFolder=outp if cmd=='convert' else inp
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures=[]
+            for size,fn,infp in files:
+                outfp=os.path.join(outp,getOutputFileName(fn,args)) if cmd=='convert' else None
+                logPath=os.path.join(logFolder,fn+'.log')
+                futures.append((infp,logPath,pool.submit(processBatchFile,cmd,infp,outfp,logPath,args)))
+            for infp,logPath,f in futures:
+                try:
+                    st=f.result()
+                except Exception as x:
+                    st={'file':infp,'error':repr(x)}
+                print("Processed:",infp,"log:",logPath,file=sys.stderr)
+                allStats.append(st or {'file':infp,'error':'not processed'})
+    else:
+        for size,fn,infp in files:
+            outfp=os.path.join(outp,getOutputFileName(fn,args)) if cmd=='convert' else None
+            try:
+                st=processSingleFile(cmd,infp,outfp,**args)
+            except Exception as x:
+                traceback.print_exc(file=sys.stderr)
+                st={'file':infp,'error':repr(x)}
+            allStats.append(st or {'file':infp,'error':'not processed'})
+    
+    pfc=len(allStats)
     if pfc>0:
+        printBatchSummary(allStats,time.time()-start)
         print("End processing, file count:",pfc,file=sys.stderr)
     else:
         print("End processing, no files found!",pfc,file=sys.stderr)        
@@ -1709,16 +4196,38 @@ Syntax:
  IXFTols <name-value-parameter-list>
  
  Parameters:
-    cmd - command, optional, values (info,convert) default info
+    cmd - command, optional, values (info,convert,index) default info,
+          index writes a row index file (.ixf file path + '.ixfidx') used by fromRow
+    decodeRows - y/n (default n), info decodes the rows to report the lob statistics,
+          by default only the header records are parsed and the rows are counted
+    estimate - y/n (default n), info extrapolates the row count from the size of
+          the first estimateRows rows (default 1000) and the file size
     in  - input entity, can be '-' for stdin (default) or a path to an .ixf file
-          or folder containing .ixf files (when batch processing is done)
+          or folder containing .ixf files (when batch processing is done),
+          .ixf.gz, .ixf.bz2 and .ixf.xz files are decompressed while they are read
     out - output entity, can be '-' for stdout (default) or a path to a file or
           folder where the converted files will be stored
-    outfmt - output format, can be csv or json default csv
-    otputLobStrategy - what to do with the lob data, by default is 'detached'
-          where each lob is written to a single file (this is default and only one
-          supported in this version)
-    fromRow - if provided allows for skipping a number of rows before start processing
+    outfmt - output format, can be csv, json or jsonl (JSON Lines, a row object by line) default csv
+    jsonBatchRows - the json and jsonl rows are written by batches of this number of rows (default 1000)
+    csvBatchRows - the csv rows are written by batches of this number of rows (default 1000)
+    outputBufferSize - the write buffer size of the output file in bytes (default 1MB)
+    outcompress - compress the output files with gz, bz2 or xz in a separate thread
+    outputEncoding - the encoding of the output file and of the text lob files (default the system encoding)
+    passthrough - y/n (default n), csv only, copy the bytes of the character columns
+          without decoding them when their code page is the outputEncoding
+    ouputLobStrategy - what to do with the lob data, by default is 'detached'
+          where each lob is written to a single file, 'packed' appends the lobs to
+          container files and writes file.offset.length/ locators in the output,
+          'hash' writes each distinct lob once in a file named by its digest,
+          'reference' leaves the lobs in their lob files and writes path.offset.length
+    lobPackScope - packed lob containers for each lob 'column' (default) or for the 'table'
+    lobPackSize - size in bytes after which a new packed lob container is started (default 1GB)
+    lobHash - the hashlib algorithm of the 'hash' lob strategy (default sha256)
+    lobHashBuffer - the lobs up to this size in bytes are hashed in memory by the 'hash' lob strategy and written only if new (default 16MB)
+    lobWorkers - number of threads writing the lobs while the rows are parsed (default 0)
+    lobBytesInFlight - lob bytes waiting for the lobWorkers threads before the parser waits (default 64MB)
+    fromRow - if provided allows for skipping a number of rows before start processing,
+          when the .ixf file has a valid row index the reading starts at the closest indexed row
     maxRows - if provided can help limit the number of rows processed 
     columns - a comma separated list of numbers (column index 1 based) or column names
               default None meaning all columns are output, if a list exists then only the
@@ -1726,8 +4235,32 @@ Syntax:
     filter  - a list of constants to be used to filter rows or a path to a python module
               that has to provide a function called 'acceptrow' accepting a single parameter
               the row to be filtered and returns True if the row is to be 
-              accepted for processing or False if not
+              accepted for processing or False if not. The module can declare the columns
+              used by the filter in a list called 'filtercolumns' (names or 1 based indexes),
+              the filter is then called as soon as these columns are decoded and the rest
+              of a rejected row is not decoded
     trace - y|n if y then additional information about ixf records will be output on stderr
+    readerMode - how the input is read: auto (default, mmap for files, buffered otherwise),
+              mmap, buffered or stream (the original reader, 3 reads per record)
+    readBufferSize - the block size in bytes used by the buffered reader (default 4MB)
+    readAhead - number of input blocks read in advance by a thread (default 0, disabled),
+              for slow inputs (NFS, pipes, compressed files), uses the buffered reader
+    inputEncoding - a python codec name overriding the code pages found in the IXF file
+    decodeErrors - python codec error handler for undecodable character data:
+              replace (default), strict, ignore, backslashreplace
+    decimalFormat - decimal|str DECIMAL and DECFLOAT values as Decimal (default) or strings
+    decfloatEncoding - dpd|bid encoding of the DECFLOAT values (default dpd)
+    indexInterval - the index command keeps the offset of every indexInterval rows (default 1000)
+    useIndex - y|n use the row index file if there is one (default y)
+    workers - number of processes used to convert a single file (default 1), each process
+              converts a range of rows and the outputs are concatenated in the row order
+    jobs - number of processes used to process the files of a folder (default 1), the
+              largest files are processed first and each file has its own .log file
+    lobBatchRows - write the rows (csv) by batches of this number of rows (default 0), the lobs
+              of a batch are read sorted by offset, nearby lobs in one read
+    lobCoalesceGap - lobs of a batch separated by at most this number of bytes are read at once (default 64KB)
+    lobHandles - number of lob files kept open while converting (default 16)
+    lobMmap - y|n memory map the open lob files (default y)
         """,file=sys.stderr)
         return True
     
@@ -1736,7 +4269,7 @@ Syntax:
     args['outfmt'] = 'csv'
     args['lobFolder'] = None
     args['outputEncoding'] = None
-    args['ouputLobStrategy'] = "detached" # also detached (name can be pk, or hash
+    args['ouputLobStrategy'] = "detached" # also packed, hash or reference
     args['trace'] = 'n'
     args['fromRow'] = None
     args['maxRows'] = None
@@ -1762,7 +4295,7 @@ Syntax:
     
     # interpret positional values
     for pv in pav:
-        if pv in ('info','convert'):
+        if pv in ('info','convert','index'):
             args['cmd']=pv
         elif pv in ('trace','-t'):
             args['trace']=True
@@ -1792,7 +4325,7 @@ Syntax:
             if os.path.isdir(inp):
                 out=inp
             else:
-                out=os.path.splitext(inp)[0]+('.csv' if args['outfmt']=='csv' else '.json')  
+                out=os.path.splitext(inp)[0]+'.'+args['outfmt']
         else:
             out='.'
     
@@ -1805,7 +4338,7 @@ Syntax:
         else:
             args['lobFolder']='.'
     
-    if args['cmd'] == 'info':out=None
+    if args['cmd'] in ('info','index'):out=None
     
     args['in']=inp
     args['out']=out
@@ -0,0 +1,41 @@
+#!/usr/bin/python3
+"""
+Measure the rows/s of IXFParser on a numeric table (DECIMAL and DECFLOAT columns).
+
+Syntax:
+  bench_numeric.py [rows=<row-count>] [file=<path-to-ixf>]
+
+If no file is provided a synthetic table (see ixfsynth.NUMERIC_COLUMNS) is
+generated in the system temporary folder.
+The rows are parsed with decimalFormat=decimal (Decimal values) and
+decimalFormat=str (canonical strings, as written in a csv file).
+"""
+import os,sys,time,tempfile
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','..','src'))
+import IXFTools
+import ixfsynth
+
+def bench(path,decimalFormat):
+    ixfp=IXFTools.IXFParser(decimalFormat=decimalFormat)
+    start=time.time()
+    with open(path,'rb') as fin:
+        ixfp.processIFXRecords(fin)
+    return time.time()-start,ixfp.rowCount
+
+def main():
+    args=dict(a.split('=',1) for a in sys.argv[1:])
+    path=args.get('file')
+    if not path:
+        path=os.path.join(tempfile.gettempdir(),'ixftools_bench_numeric.ixf')
+        rows=int(args.get('rows',1000000))
+        print("Generating",rows,"rows in:",path)
+        ixfsynth.writeSyntheticIXF(path,rows,ixfsynth.NUMERIC_COLUMNS,'numeric')
+    size=os.path.getsize(path)/(1024*1024)
+    print("File size(MB): %.1f" % size)
+    for decimalFormat in ('decimal','str'):
+        sec,rows=bench(path,decimalFormat)
+        print("decimalFormat=%-8s parsed rows=%d time(sec)=%.2f rows/s=%d" % (decimalFormat,rows,sec,rows/sec))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""
+Measure the IXF record reading speed (MB/s) of IXFParser for each reader mode.
+
+Syntax:
+  bench_reader.py [rows=<row-count>] [payload=<bytes>] [file=<path-to-ixf>] [latency=<ms>]
+
+If no file is provided a synthetic table with a single D record per row
+is generated in the system temporary folder, payload adds a CHAR column
+of the given size to each row (wide records).
+The 'stream' reader mode is the original record reader (3 reads per record)
+The parsing is also measured with the buffered reader and readAhead=4,
+latency adds a delay to each read of the input (a slow disk or NFS).
+"""
+import os,sys,io,time,tempfile
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','..','src'))
+import IXFTools
+import ixfsynth
+
+class SlowReader(io.RawIOBase):
+    """
+    A file reader waiting latency seconds before each read
+    """
+    def __init__(self,fin,latency):
+        self.fin=fin
+        self.latency=latency
+    
+    def readable(self):
+        return True
+    
+    def readinto(self,view):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.fin.readinto(view)
+
+def benchRecords(path,readerMode):
+    """
+    Only split the file in records (no field decoding)
+    """
+    start=time.time()
+    count=0
+    with open(path,'rb') as fin:
+        feed=IXFTools.openRecordFeed(fin,readerMode)
+        while feed.readRecord():
+            count+=1
+        feed.close()
+    return time.time()-start,count
+
+def bench(path,readerMode,readAhead=0,latency=0):
+    ixfp=IXFTools.IXFParser(readerMode=readerMode,readAhead=readAhead)
+    start=time.time()
+    with open(path,'rb') as fin:
+        if latency:
+            fin=SlowReader(fin,latency)
+        ixfp.processIFXRecords(fin)
+    return time.time()-start,ixfp.rowCount
+
+def main():
+    args=dict(a.split('=',1) for a in sys.argv[1:])
+    path=args.get('file')
+    if not path:
+        path=os.path.join(tempfile.gettempdir(),'ixftools_bench_reader.ixf')
+        rows=int(args.get('rows',1000000))
+        columns=ixfsynth.NARROW_COLUMNS
+        payload=int(args.get('payload',0))
+        if payload>0:
+            columns=columns+[('PAYLOAD','452','%05d' % payload,lambda n:b'x'*payload)]
+        print("Generating",rows,"rows in:",path)
+        ixfsynth.writeSyntheticIXF(path,rows,columns)
+    size=os.path.getsize(path)/(1024*1024)
+    print("File size(MB): %.1f" % size)
+    for readerMode in ('stream','buffered','mmap'):
+        sec,recs=benchRecords(path,readerMode)
+        print("readerMode=%-8s records=%d time(sec)=%.2f MB/s=%.1f" % (readerMode,recs,sec,size/sec))
+    for readerMode in ('stream','buffered','mmap'):
+        sec,rows=bench(path,readerMode)
+        print("readerMode=%-8s parsed rows=%d time(sec)=%.2f MB/s=%.1f" % (readerMode,rows,sec,size/sec))
+    latency=float(args.get('latency',0))/1000
+    for readAhead in (0,4):
+        sec,rows=bench(path,'buffered',readAhead,latency)
+        print("readerMode=buffered readAhead=%d latency(ms)=%s parsed rows=%d time(sec)=%.2f MB/s=%.1f" % (
+            readAhead,args.get('latency',0),rows,sec,size/sec))
+
+if __name__ == '__main__':
+    main()
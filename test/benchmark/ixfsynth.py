@@ -0,0 +1,156 @@
+"""
+Synthetic IXF file generator used by the benchmarks.
+
+The generated files contain only the H, T, C and D records needed by
+IXFTools.py to parse the table, the values are deterministic so two
+runs on the same file produce the same output.
+"""
+import struct
+
+def ixfRecord(rt,body):
+    """
+    Return a complete IXF record (length, type and body)
+    """
+    return b'%06d' % (len(body)+1) + rt + body
+
+def fixed(v,ln,pad=b' '):
+    v=v.encode() if type(v)==str else v
+    return v[:ln].ljust(ln,pad)
+
+def headerRecord():
+    return ixfRecord(b'H',
+        b'IXF'+b'0002'+fixed('DB2    02.00',12)+b'20240208'+b'112316'+
+        b'00006'+b'01208'+b'01200'+b'  '
+    )
+
+def tableRecord(name,colCount):
+    return ixfRecord(b'T',
+        b'%03d' % len(name)+fixed(name,256)+b'000'+fixed('',256)+fixed('',12)+
+        b'C'+b'M'+b'PC   '+b'I'+b'%05d' % colCount+b'  '+fixed('',30)+
+        fixed('',257,b'\x00')*4
+    )
+
+def columnRecord(name,coltype,length,cid,pos,nullable='N',sbcp='01208'):
+    return ixfRecord(b'C',
+        b'%03d' % len(name)+fixed(name,256)+nullable.encode()+b'N'+b'Y'+b'N\x00'+b'R'+
+        coltype.encode()+sbcp.encode()+b'00000'+length.encode()+b'%03d' % cid+b'%06d' % pos+
+        fixed('',30)+b'0'*20+b'000'+fixed('',256)+b'000'+fixed('',254)+b'0'+b'00'+b'0'*10
+    )
+
+def dataRecord(cid,cols):
+    return ixfRecord(b'D',b'%03d' % cid+b'    '+cols)
+
+# (name, type, IXFCLENG, value(rowNum) -> storage bytes[, single byte code page])
+# the code page is 01208 by default, 00000 for the FOR BIT DATA columns
+NARROW_COLUMNS=[
+    ('ID','496','00000',lambda n:struct.pack('<i',n)),
+    ('NAME','448','00032',lambda n:(lambda v:struct.pack('<H',len(v))+v)(b'name_%d' % n)),
+    ('AMOUNT','492','00000',lambda n:struct.pack('<q',n*1000)),
+    ('CODE','452','00010',lambda n:fixed('C%d' % (n%1000),10)),
+]
+
+def packDecimal(v,precision):
+    """
+    Packed decimal (BCD) storage of the int v with precision digits
+    """
+    digits=str(abs(v)).rjust(precision,'0')
+    if precision%2==0:
+        digits='0'+digits
+    return bytes.fromhex(digits+('d' if v<0 else 'c'))
+
+def dpdDeclet(n):
+    """
+    Densely packed decimal declet (10 bits) of the 3 digits number n
+    """
+    d2,d1,d0=n//100,n//10%10,n%10
+    large=(d2>7,d1>7,d0>7)
+    if large==(False,False,False):
+        return (d2<<7)|(d1<<4)|d0
+    if large==(False,False,True):
+        return (d2<<7)|(d1<<4)|0b1000|(d0&1)
+    if large==(False,True,False):
+        return (d2<<7)|((d0>>1)&3)<<5|(d1&1)<<4|0b1010|(d0&1)
+    if large==(True,False,False):
+        return ((d0>>1)&3)<<8|(d2&1)<<7|(d1<<4)|0b1100|(d0&1)
+    if large==(True,True,False):
+        return ((d0>>1)&3)<<8|(d2&1)<<7|(d1&1)<<4|0b1110|(d0&1)
+    if large==(True,False,True):
+        return ((d1>>1)&3)<<8|(d2&1)<<7|0b01<<5|(d1&1)<<4|0b1110|(d0&1)
+    if large==(False,True,True):
+        return (d2<<7)|0b10<<5|(d1&1)<<4|0b1110|(d0&1)
+    return (d2&1)<<7|0b11<<5|(d1&1)<<4|0b1110|(d0&1)
+
+def decimalDPD(coef,exp,nbytes=8):
+    """
+    IEEE 754 decimal64 (nbytes=8) or decimal128 (nbytes=16) DPD storage (little endian)
+    of coef*10**exp, coef has at most 16 (decimal64) or 34 (decimal128) digits
+    """
+    nbits=nbytes*8
+    ecbits=8 if nbytes==8 else 12 # exponent continuation bits
+    ccbits=nbits-6-ecbits # coefficient continuation bits
+    sign=1 if coef<0 else 0
+    digits=str(abs(coef)).rjust(ccbits//10*3+1,'0')
+    bexp=exp+(398 if nbytes==8 else 6176)
+    msd=int(digits[0])
+    if msd<8:
+        comb=(bexp>>ecbits)<<3|msd
+    else:
+        comb=0b11000|(bexp>>ecbits)<<1|(msd&1)
+    v=sign<<(nbits-1)|comb<<(nbits-6)|(bexp&((1<<ecbits)-1))<<ccbits
+    for i in range(ccbits//10):
+        v|=dpdDeclet(int(digits[1+3*i:4+3*i]))<<(ccbits-10-10*i)
+    return v.to_bytes(nbytes,'little')
+
+def decimal64(coef,exp):
+    return decimalDPD(coef,exp,8)
+
+def decimal128(coef,exp):
+    return decimalDPD(coef,exp,16)
+
+def decimalSpecial(name,nbytes=8):
+    """
+    IEEE 754 decimal storage (little endian) of 'Infinity', '-Infinity', 'NaN' or '-NaN'
+    """
+    nbits=nbytes*8
+    sign=1 if name.startswith('-') else 0
+    comb=0x1e if name.lstrip('-')=='Infinity' else 0x1f
+    return (sign<<(nbits-1)|comb<<(nbits-6)).to_bytes(nbytes,'little')
+
+# numeric table: DECIMAL(15,2), DECIMAL(9,0) and DECFLOAT(16)
+NUMERIC_COLUMNS=[
+    ('ID','496','00000',lambda n:struct.pack('<i',n)),
+    ('AMOUNT','484','01502',lambda n:packDecimal(n*1234567-50000,15)),
+    ('QTY','484','00900',lambda n:packDecimal(n%100000-500,9)),
+    ('PRICE','484','00704',lambda n:packDecimal(n%9999999,7)),
+    ('RATE','996','00016',lambda n:decimal64(n*31-7,-4)),
+]
+
+def slotSize(coltype,length,value):
+    """
+    Storage size reserved for a column in the D record
+    """
+    if coltype in ('448','908'):
+        return 2+int(length)
+    return len(value(1))
+
+def writeSyntheticIXF(path,rowCount,columns=NARROW_COLUMNS,name='synthetic'):
+    """
+    Write an IXF file with rowCount rows, all the columns are stored
+    in a single D record per row.
+    Return the size of the written file.
+    """
+    with open(path,'wb') as out:
+        out.write(headerRecord())
+        out.write(tableRecord(name,len(columns)))
+        pos=1
+        for col in columns:
+            cn,ct,cl,cv=col[:4]
+            out.write(columnRecord(cn,ct,cl,1,pos,sbcp=col[4] if len(col)>4 else '01208'))
+            pos+=slotSize(ct,cl,cv)
+        for n in range(1,rowCount+1):
+            cols=bytearray()
+            for col in columns:
+                cn,ct,cl,cv=col[:4]
+                cols+=cv(n).ljust(slotSize(ct,cl,cv),b' ')
+            out.write(dataRecord(1,bytes(cols)))
+        return out.tell()
@@ -0,0 +1,4 @@
+#!/bin/bash
+ACTION="../../../../../src/IXFTools.py"
+mkdir -p testOutput
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=testOutput ouputLobStrategy=hash > cmd.out 2>&1
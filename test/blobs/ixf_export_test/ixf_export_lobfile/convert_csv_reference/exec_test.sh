@@ -0,0 +1,7 @@
+#!/bin/bash
+ACTION="../../../../../src/IXFTools.py"
+mkdir -p testOutput
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=testOutput ouputLobStrategy=reference > cmd.out 2>&1
+# the lob references are absolute paths, the expected output has them relative to the inst folder
+INST=$(cd ../inst && pwd)
+sed -i "s#$INST/#../inst/#g" testOutput/blobs_ixf_lobfile.csv
@@ -0,0 +1,32 @@
+#!/usr/bin/python3
+"""
+Compare the lobs of two packed csv outputs: each lob location specifier
+(container.offset.length/) of the first file must locate the same bytes
+as the specifier at the same place of the second file.
+Usage: check_packed.py <folder1>/<file1.csv> <folder2>/<file2.csv>
+"""
+import sys,os,csv
+
+def readLobs(path):
+    lobs=[]
+    with open(path,newline='') as f:
+        for row in list(csv.reader(f))[2:]:
+            for v in row:
+                if v.endswith('/'):
+                    fn,offset,length=v[:-1].rsplit('.',2)
+                    with open(os.path.join(os.path.dirname(path),fn),'rb') as lf:
+                        lf.seek(int(offset))
+                        lobs.append(lf.read(int(length)))
+    return lobs
+
+def main():
+    a=readLobs(sys.argv[1])
+    b=readLobs(sys.argv[2])
+    if a!=b:
+        print("packed lobs differ:",sys.argv[1],sys.argv[2])
+        return False
+    print("packed lobs:",len(a),"same data")
+    return True
+
+if __name__ == '__main__':
+    if not main():sys.exit(1)
@@ -0,0 +1,15 @@
+#!/bin/bash
+# a parallel conversion (a part for each row) must give the output of a serial one,
+# the packed lobs of each part are in their own containers (table_column_partNNN.000.lob)
+ACTION="../../../../../src/IXFTools.py"
+mkdir -p serial workers serial_json workers_json serial_packed workers_packed
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=serial > cmd.out 2>&1
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=workers workers=3 indexInterval=1 >> cmd.out 2>&1
+cmp serial/blobs_ixf_lobfile.csv workers/blobs_ixf_lobfile.csv >> cmd.out 2>&1 && \
+ diff -r serial workers >> cmd.out 2>&1 && echo "workers=3 and serial: same output" >> cmd.out
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=serial_json outfmt=json >> cmd.out 2>&1
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=workers_json outfmt=json workers=3 indexInterval=1 >> cmd.out 2>&1
+diff -r serial_json workers_json >> cmd.out 2>&1 && echo "json workers=3 and serial: same output" >> cmd.out
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=serial_packed ouputLobStrategy=packed >> cmd.out 2>&1
+$ACTION cmd=convert in=../inst/blobs_ixf_lobfile.ixf out=workers_packed ouputLobStrategy=packed workers=3 indexInterval=1 >> cmd.out 2>&1
+./check_packed.py serial_packed/blobs_ixf_lobfile.csv workers_packed/blobs_ixf_lobfile.csv >> cmd.out 2>&1
@@ -0,0 +1,5 @@
+#!/bin/bash
+# the FOR BIT DATA columns are written as hex strings
+../../../src/IXFTools.py cmd=convert in=../inst/bitdata.ixf out=. > cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=../inst/bitdata.ixf out=. outfmt=json >> cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=../inst/bitdata.ixf out=bitdata_raw.csv passthrough=y outputEncoding=utf-8 >> cmd.out 2>&1
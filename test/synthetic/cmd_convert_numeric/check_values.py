@@ -0,0 +1,38 @@
+#!/usr/bin/python3
+"""
+Check the DECIMAL and DECFLOAT values of a numeric.ixf conversion against
+the values the file was generated from (see ../inst/make_inst.py).
+Usage: check_values.py <file.csv>
+"""
+import sys,os,csv,decimal
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','inst'))
+from make_inst import NUMERIC_VALUES
+
+def sameValue(expected,found):
+    e=decimal.Decimal(expected)
+    f=decimal.Decimal(found)
+    if e.is_nan():
+        return f.is_nan()
+    # the value and the exponent (the scale of DECIMAL, the quantum of DECFLOAT)
+    return e==f and e.as_tuple().exponent==f.as_tuple().exponent
+
+def main():
+    with open(sys.argv[1],newline='') as f:
+        rows=list(csv.reader(f))
+    header,rows=rows[0],rows[2:]
+    errors=0
+    for cn,ct,cl,values in NUMERIC_VALUES:
+        ci=header.index(cn)
+        for row,expected in zip(rows,values):
+            if not sameValue(expected,row[ci]):
+                print("Wrong value, row",row[0],"column",cn,"expected:",expected,"found:",row[ci])
+                errors+=1
+    if len(rows)!=len(NUMERIC_VALUES[0][3]):
+        print("Wrong row count:",len(rows))
+        errors+=1
+    print(sys.argv[1],"values checked, errors:",errors)
+    return errors==0
+
+if __name__ == '__main__':
+    if not main():sys.exit(1)
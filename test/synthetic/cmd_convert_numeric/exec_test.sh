@@ -0,0 +1,8 @@
+#!/bin/bash
+# the DECIMAL (odd and even precision) and DECFLOAT(16/34) values, NaN and Infinity
+# included, are checked against the values numeric.ixf was generated from
+mkdir -p decimal str
+../../../src/IXFTools.py cmd=convert in=../inst/numeric.ixf out=decimal > cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=../inst/numeric.ixf out=str decimalFormat=str >> cmd.out 2>&1
+./check_values.py decimal/numeric.csv >> cmd.out 2>&1
+./check_values.py str/numeric.csv >> cmd.out 2>&1
@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Generate the synthetic .ixf files used by the test/synthetic tests
+(see test/benchmark/ixfsynth.py), run it in this folder.
+"""
+import os,sys,struct,decimal
+
+sys.path.insert(0,os.path.join(os.path.dirname(os.path.abspath(__file__)),'..','..','benchmark'))
+from ixfsynth import writeSyntheticIXF,fixed,packDecimal,decimalDPD,decimalSpecial
+
+def varchar(v):
+    return struct.pack('<H',len(v))+v
+
+# CHAR(4) and VARCHAR(8) FOR BIT DATA columns (code page 00000) next to a text column
+BITDATA_VALUES=[b'A\x80\x01\xfe',b'\x00\x00\x00\x00',b'\xff"\n,']
+BITDATA_COLUMNS=[
+    ('ID','496','00000',lambda n:struct.pack('<i',n)),
+    ('TAG','452','00004',lambda n:BITDATA_VALUES[n-1],'00000'),
+    ('VTAG','448','00008',lambda n:varchar(BITDATA_VALUES[n-1][:n+1]),'00000'),
+    ('NAME','452','00006',lambda n:fixed('name%d' % n,6)),
+]
+
+def packedValue(v,precision,scale):
+    return packDecimal(int(decimal.Decimal(v).scaleb(scale)),precision)
+
+def decfloatValue(v,nbytes):
+    d=decimal.Decimal(v)
+    if not d.is_finite():
+        return decimalSpecial(v,nbytes)
+    t=d.as_tuple()
+    coef=int(''.join(map(str,t.digits)))
+    return decimalDPD(-coef if t.sign else coef,t.exponent,nbytes)
+
+# the values of the numeric.ixf columns: (name, type, IXFCLENG, values)
+NUMERIC_VALUES=[
+    ('DEC_ODD','484','00702',['12345.67','-12345.67','0.01','-0.01','0.00','-99999.99']),
+    ('DEC_EVEN','484','00803',['12345.678','-99999.999','0.000','-0.001','1.000','80808.080']),
+    ('DEC_INT','484','01000',['9999999999','-1','0','-1234567890','42','-9999999999']),
+    ('DEC_ODD_INT','484','00500',['12345','-12345','0','-7','99999','-99999']),
+    ('DF16','996','00016',['1234567890123456','-1.5E-10','NaN','Infinity','-Infinity','9876543210987654E+369']),
+    ('DF34','996','00034',['1234567890123456789012345678901234E-20','-0.1','-Infinity','NaN',
+        '9999999999999999999999999999999999E+6111','-8.000000000000000000000000000000009E-6143']),
+]
+
+def numericColumns():
+    columns=[('ID','496','00000',lambda n:struct.pack('<i',n))]
+    for cn,ct,cl,values in NUMERIC_VALUES:
+        if ct=='484':
+            enc=lambda v,cl=cl:packedValue(v,int(cl[:3]),int(cl[3:]))
+        else:
+            enc=lambda v,cl=cl:decfloatValue(v,8 if cl=='00016' else 16)
+        columns.append((cn,ct,cl,lambda n,values=values,enc=enc:enc(values[n-1])))
+    return columns
+
+def main():
+    writeSyntheticIXF('bitdata.ixf',len(BITDATA_VALUES),BITDATA_COLUMNS,'bitdata')
+    writeSyntheticIXF('numeric.ixf',len(NUMERIC_VALUES[0][3]),numericColumns(),'numeric')
+
+if __name__ == '__main__':
+    main()
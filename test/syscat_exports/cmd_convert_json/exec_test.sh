@@ -0,0 +1,3 @@
+#!/bin/bash
+../../../src/IXFTools.py cmd=convert in=../inst/syscat.tables.ixf out=. outfmt=json > cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=../inst/syscat.tables.ixf out=. outfmt=jsonl >> cmd.out 2>&1
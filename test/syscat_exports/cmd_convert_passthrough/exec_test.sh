@@ -0,0 +1,5 @@
+#!/bin/bash
+# the utf-8 character columns are copied without decoding them
+../../../src/IXFTools.py cmd=convert in=../inst/syscat.tables.ixf out=decoded.csv outputEncoding=utf-8 > cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=../inst/syscat.tables.ixf out=passthrough.csv outputEncoding=utf-8 passthrough=y >> cmd.out 2>&1
+cmp decoded.csv passthrough.csv >> cmd.out 2>&1 && echo "passthrough and decoded: same output" >> cmd.out
@@ -0,0 +1,5 @@
+#!/bin/bash
+# the parts converted by the worker processes are concatenated in the row order
+../../../src/IXFTools.py cmd=convert in=../inst/syscat.tables.ixf out=serial.csv > cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=../inst/syscat.tables.ixf out=workers.csv workers=3 indexInterval=100 >> cmd.out 2>&1
+cmp serial.csv workers.csv >> cmd.out 2>&1 && echo "workers=3 and serial: same output" >> cmd.out
@@ -0,0 +1,10 @@
+#!/bin/bash
+# the row index is written next to a link to the input (indexed.ixf.ixfidx),
+# the rows read from the closest indexed row must be the rows read without the index
+ln -sf ../inst/syscat.tables.ixf indexed.ixf
+../../../src/IXFTools.py cmd=index in=indexed.ixf indexInterval=50 > cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=indexed.ixf out=fromrow_index.csv fromRow=120 maxRows=20 >> cmd.out 2>&1
+../../../src/IXFTools.py cmd=convert in=indexed.ixf out=fromrow_noindex.csv fromRow=120 maxRows=20 useIndex=n >> cmd.out 2>&1
+cmp fromrow_index.csv fromrow_noindex.csv >> cmd.out 2>&1 && echo "fromRow with and without index: same output" >> cmd.out
+# the index is only valid for the mtime of the input, it is not kept
+rm -f indexed.ixf indexed.ixf.ixfidx
@@ -1,3 +1,6 @@
+# the columns used by the filter (names or 1 based indexes), optional
+filtercolumns=['TABNAME']
+
 def rowfilter(row):
   return row[1] == 'SYSVIEWS'
 